@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 import logging
+import hashlib
+import glob
+import os
+import functools
 logging.basicConfig(level=logging.INFO)
 from _12_LWE_function import *
 from _13_GWPstar_functions import * 
@@ -11,8 +15,8 @@ def format_scenario_name(aircraft, year):
     string = str(aircraft)+', '+str(int(year))
     return string
 
-#%% function to read LCIA files into individual dataframes per (combination of) scenario(s)
-def read_LCIAs(file_name):
+#%% function to parse LCIA files (as exported from the AB) into individual dataframes per (combination of) scenario(s)
+def parse_LCIAs(file_name):
     df = pd.read_excel(file_name)
     # drop the nan row
     df = df.dropna(how='all')
@@ -80,56 +84,172 @@ def read_LCIAs(file_name):
         if aircraft_here not in aircraft: aircraft.append(aircraft_here)
         if year_here not in years: years.append(year_here)
         # Add dataframe to dict
-        separate_dataframes[format_scenario_name(aircraft_here,year_here)] = df_here
+        separate_dataframes[format_scenario_name(aircraft_here,year_here)] = df_here.astype(float)
     
     return separate_dataframes, aircraft, years
 
+#%% cache of parsed LCIA files, so that repeated runs do not have to parse the Excel files again
+LCIA_cache_folder = 'LCIA_cache' # set to None to always parse the Excel files
+LCIA_cache_version = 1 # increase when the way LCIA files are parsed changes, to invalidate existing cache files
+
+def file_hash(file_name):
+    # hash of the file content, so that the cache is invalidated whenever the file itself changes
+    content_hash = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+def LCIA_cache_name(file_name, cache_folder):
+    file_stem = os.path.splitext(os.path.basename(file_name))[0]
+    return os.path.join(cache_folder, file_stem+'-v'+str(LCIA_cache_version)+'-'+file_hash(file_name)[:16]+'.npz')
+
+#%% function to read LCIA files into individual dataframes per (combination of) scenario(s), using the cache if possible
+def read_LCIAs(file_name, cache_folder=LCIA_cache_folder):
+    if cache_folder is None: return parse_LCIAs(file_name)
+    cache_name = LCIA_cache_name(file_name, cache_folder)
+    
+    # warm start: rebuild the dataframes from the cached arrays
+    if os.path.exists(cache_name):
+        with np.load(cache_name, allow_pickle=False) as cache:
+            processes = cache['processes'].tolist()
+            impact_categories = cache['impact_categories'].tolist()
+            separate_dataframes = {}
+            for key, values in zip(cache['keys'].tolist(), cache['values']):
+                separate_dataframes[key] = pd.DataFrame(values, index=processes, columns=impact_categories)
+            return separate_dataframes, cache['aircraft'].tolist(), cache['years'].tolist()
+    
+    # cold start: parse the Excel file and store the result for next time
+    separate_dataframes, aircraft, years = parse_LCIAs(file_name)
+    first_df = separate_dataframes[list(separate_dataframes.keys())[0]]
+    os.makedirs(cache_folder, exist_ok=True)
+    # remove cache files of previous versions of the same file
+    file_stem = os.path.splitext(os.path.basename(file_name))[0]
+    for old_cache_name in glob.glob(os.path.join(glob.escape(cache_folder), glob.escape(file_stem)+'-v*.npz')):
+        if os.path.basename(old_cache_name).rsplit('-', 2)[0] == file_stem: os.remove(old_cache_name)
+    # write to a temporary file first, so that an interrupted run cannot leave a broken cache file behind
+    with open(cache_name+'.tmp', 'wb') as f:
+        np.savez(f,
+                 keys = np.array(list(separate_dataframes.keys())),
+                 values = np.stack([df.to_numpy(dtype=float) for df in separate_dataframes.values()]),
+                 processes = np.array(first_df.index.tolist()),
+                 impact_categories = np.array(first_df.columns.tolist()),
+                 aircraft = np.array(aircraft),
+                 years = np.array(years, dtype=float))
+    os.replace(cache_name+'.tmp', cache_name)
+    logging.info(f"Cached LCIA data of {file_name} in {cache_name}")
+    
+    return separate_dataframes, aircraft, years
+
+#%% container for yearly LCI(A) data: a single array with dimensions (item, year, process, impact category)
+# items are e.g. aircraft or plants; string keys made with format_scenario_name can still be used to get the dataframe of an item in a year
+class YearlyLCIA:
+    def __init__(self, data, names, years, processes, impact_categories):
+        self.data = data
+        self.names = list(names)
+        self.years = [int(year) for year in years]
+        self.processes = list(processes)
+        self.impact_categories = list(impact_categories)
+        # map labels to positions in the array
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+        self.year_index = {year: i for i, year in enumerate(self.years)}
+        self.process_index = {process: i for i, process in enumerate(self.processes)}
+    
+    # positions of an item and year in the array
+    def name_position(self, name):
+        return self.name_index[name]
+    
+    def position(self, name, year):
+        return self.name_position(name), self.year_index[int(year)]
+    
+    def position_from_key(self, key):
+        name, year = key.rsplit(', ', 1)
+        return self.position(name, float(year))
+    
+    # dictionary-like access, matching the dictionaries of dataframes that were previously used
+    # LCI(A) data of one process for a number of items and years, as a (year, item, impact category) array
+    def process_data(self, process, names, years):
+        item_indices = np.array([self.name_position(name) for name in names], dtype = int)
+        year_indices = np.array([self.year_index[int(year)] for year in years], dtype = int)
+        return self.data[item_indices[np.newaxis, :], year_indices[:, np.newaxis], self.process_index[process]]
+    
+    def __getitem__(self, key):
+        i, j = self.position_from_key(key)
+        return pd.DataFrame(self.data[i, j], index = self.processes, columns = self.impact_categories)
+    
+    def __contains__(self, key):
+        try: self.position_from_key(key)
+        except (KeyError, ValueError): return False
+        return True
+    
+    def __len__(self):
+        return len(self.names)*len(self.years)
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def keys(self):
+        return [format_scenario_name(name, year) for name in self.names for year in self.years]
+    
+    def values(self):
+        return [self[key] for key in self.keys()]
+    
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+#%% view on yearly LCI(A) data which is identical for each cohort (e.g., plants of each year of construction)
+# keys like '<cohort> plants, <year>' are resolved to the data of that year on demand, without copying data for every cohort
+class CohortLCIA(YearlyLCIA):
+    def __init__(self, yearly_data, cohort_start, cohort_end, string):
+        # each cohort uses the data of the last item in the file (a view, not a copy)
+        self.data = yearly_data.data[-1:]
+        self.years = yearly_data.years
+        self.processes = yearly_data.processes
+        self.impact_categories = yearly_data.impact_categories
+        self.year_index = yearly_data.year_index
+        self.process_index = yearly_data.process_index
+        self.cohort_start = cohort_start
+        self.cohort_end = cohort_end
+        self.string = string
+    
+    @property
+    def names(self):
+        return [str(i)+' '+self.string for i in range(self.cohort_start, self.cohort_end + 1)]
+    
+    def name_position(self, name):
+        cohort, string = name.split(' ', 1)
+        if string != self.string or not self.cohort_start <= int(cohort) <= self.cohort_end: raise KeyError(name)
+        return 0
+    
+    def __len__(self):
+        return (self.cohort_end - self.cohort_start + 1)*len(self.years)
+
 #%% build full timeline of LCI(A) data based on start year and end year
 def expand_LCIAs(file_name, y_start, y_stop):
     # extract scenarios into dict of individual scenarios
     dataframes_data, aircraft, years_data = read_LCIAs(file_name)
-    # create a dictionary to store the yearly dataframes
-    dataframes_yearly = {}
-    for a in aircraft:
-        # fill in dict starting from each year and moving up, skipping the final year
-        for i in range(len(years_data)-1):
-            data_string_here = format_scenario_name(a,years_data[i])
-            data_string_next = format_scenario_name(a, years_data[i+1]) 
-            data_here = dataframes_data[data_string_here]
-            data_next = dataframes_data[data_string_next]
-            year_here = years_data[i]
-            # fill in gaps between data points with linear interpolation
-            while year_here < years_data[i+1]:
-                df_here = data_here + (data_next - data_here)*(year_here - years_data[i])/(years_data[i+1] - years_data[i])
-                year_string = format_scenario_name(a, year_here)
-                dataframes_yearly[year_string] = df_here
-                year_here += 1
-        # finally, add the data for the last year in the dataset
-        year_string = format_scenario_name(a, year_here)  
-        dataframes_yearly[year_string] = data_next
-        
-    # change the dictionary of yearly dataframes to match the timeline of y_start and y_stop
-    dataframes_timeline = {}
-    for a in aircraft:
-        i = y_start
-        # account for the possibility that timeline starts before first data point
-        while i <= years_data[0]:
-            string_here = format_scenario_name(a, i)
-            string_data = format_scenario_name(a, years_data[0])
-            dataframes_timeline[string_here] = dataframes_yearly[string_data]
-            i += 1
-        # duplicating dictionary made earlier to timeline dictionary
-        while i <= years_data[-1]:
-            string_here = format_scenario_name(a, i)
-            dataframes_timeline[string_here] = dataframes_yearly[string_here]
-            i += 1
-        # account for possibility that timeline ends after last data point
-        while i <= y_stop:
-            string_here = format_scenario_name(a, i)
-            string_data = format_scenario_name(a, years_data[-1])      
-            dataframes_timeline[string_here] = dataframes_yearly[string_data]
-            i += 1
-            
+    first_df = dataframes_data[list(dataframes_data.keys())[0]]
+    # stack data points into a single array with dimensions (item, data point, process, impact category)
+    data_points = np.array([[dataframes_data[format_scenario_name(a, y)].to_numpy() for y in years_data] for a in aircraft])
+    years_data = np.array(years_data, dtype = float)
+    years_timeline = list(range(y_start, y_stop + 1))
+    # account for the possibility that timeline starts before first data point or ends after last data point
+    years_here = np.clip(np.array(years_timeline, dtype = float), years_data[0], years_data[-1])
+    if len(years_data) == 1:
+        data_timeline = data_points[:, [0]*len(years_timeline)]
+    else:
+        # fill in gaps between data points with linear interpolation, using the data point at the start of each interval
+        i = np.clip(np.searchsorted(years_data, years_here, side = 'right') - 1, 0, len(years_data) - 2)
+        data_here = data_points[:, i]
+        data_next = data_points[:, i + 1]
+        step = (years_here - years_data[i])[np.newaxis, :, np.newaxis, np.newaxis]
+        interval = (years_data[i + 1] - years_data[i])[np.newaxis, :, np.newaxis, np.newaxis]
+        data_timeline = data_here + (data_next - data_here)*step/interval
+        # the last data point itself is used as-is
+        data_timeline[:, years_here == years_data[-1]] = data_points[:, [-1]]
+    
+    dataframes_timeline = YearlyLCIA(data_timeline, aircraft, years_timeline, first_df.index, first_df.columns)
+    
     return dataframes_timeline, aircraft
 
 #%% function used in the creation of dataframes for plant/market processes
@@ -142,13 +262,7 @@ def reformat_yearly_data(dataframes_temp, y_start, y_end, cases, string):
     cases = []
     for i in range(y_plants_start, y_plants_end + 1):
         cases.append(str(i)+' '+string)
-    dataframes_timeline = {}
-    for i in cases:
-        # fill in dict starting from each year and moving up
-        for key, df_here in dataframes_temp.items():
-            year_here = float(key.split(",")[1].strip())
-            year_string = format_scenario_name(i, year_here)
-            dataframes_timeline[year_string] = df_here
+    dataframes_timeline = CohortLCIA(dataframes_temp, y_plants_start, y_plants_end, string)
     
     return dataframes_timeline, cases
 
@@ -185,280 +299,235 @@ def build_occupation(occupation_y0, y0, occupation_y1, y1, occupation_y2, y2):
     
     return occupation
 
+#%% entry matrix builder: (year, model) array showing for each year which model(s) of each group are the most recent to have entered service
+# cached, as it only depends on the EIS and group of each model (both passed as tuples)
+@functools.lru_cache(maxsize = None)
+def entry_matrix(eis, groups, y_start, y_stop):
+    eis = np.array(eis, dtype = float)
+    groups = np.array(groups)
+    years = np.arange(y_start, y_stop)
+    chosen = np.zeros((len(years), len(eis)))
+    for group in set(groups.tolist()):
+        in_group = groups == group
+        # most recent EIS up to each year, as a cumulative maximum over the years in which a model of the group enters service (0 if none has yet)
+        eis_before = eis[in_group & (eis < y_start)].max(initial = 0)
+        latest = np.maximum.accumulate(np.maximum(np.where(np.isin(years, eis[in_group]), years, 0), eis_before))
+        chosen[:, in_group] = eis[in_group] == latest[:, np.newaxis]
+    chosen.flags.writeable = False # shared between calls through the cache
+    return chosen
+
 #%% entry list builder: determines for a given range of years what aircraft enters service
 def entry_list(aircraft_char, y_start, y_stop, h2_share):
-    entries = []
-    for t in range(y_stop-y_start):
-        y_here = t + y_start # from t (position in time series) to y_here (current year)
-        req_eis = aircraft_char.loc['EIS'] <= y_here # filter out aircraft not entering service yet
-        # filter aircraft into fuel types + only keep most recent model
-        req_hc = aircraft_char.loc['fuel type'] == 'hydrocarbon'
-        chosen_hc = aircraft_char.loc['EIS'] == max(req_eis*req_hc*aircraft_char.loc['EIS'])
-        chosen_hc = chosen_hc*req_hc    
-        req_h2 = aircraft_char.loc['fuel type'] == 'hydrogen'
-        chosen_h2 = aircraft_char.loc['EIS'] == max(req_eis*req_h2*aircraft_char.loc['EIS'])
-        chosen_h2 = chosen_h2*req_h2
-        # create list of most recent model(s), taking into account split between HC and H2 (based on RPK)
-        if sum(chosen_h2) > 0:
-            entries.append(h2_share*chosen_h2 + (1 - h2_share)*chosen_hc)
-        else: entries.append(1*chosen_hc)
-        
-    entries = pd.DataFrame(entries)
+    fuel_types = tuple(aircraft_char.loc['fuel type'])
+    chosen = entry_matrix(tuple(aircraft_char.loc['EIS']), fuel_types, y_start, y_stop)
+    # split into fuel types (each only keeping the most recent model)
+    chosen_hc = chosen*(np.array(fuel_types) == 'hydrocarbon')
+    chosen_h2 = chosen*(np.array(fuel_types) == 'hydrogen')
+    # most recent model(s), taking into account split between HC and H2 (based on RPK) once hydrogen aircraft are available
+    h2_available = chosen_h2.sum(axis = 1, keepdims = True) > 0
+    entries = np.where(h2_available, h2_share*chosen_h2 + (1 - h2_share)*chosen_hc, chosen_hc)
     
     return entries
 
+#%% stock-flow engine shared by the fleet builders (aircraft and fuel plants): builds an age-structured fleet that meets a demand time series
+# capacity: (year, model) array with what a single unit of each model delivers in that year (e.g., RPK for aircraft, MJ for plants)
+# entries_0: (age, model) array with the models in the starting fleet, oldest first; entries_t: (year, model) array with the models entering the fleet
+def build_stock(capacity, entries_0, entries_t, ages_0, demand):
+    max_age = len(entries_0)
+    fleet = np.zeros((len(demand), capacity.shape[1]))   # timeline array where each row is the number of units of each generation in the fleet (e.g.: [100, 10, 0] shows that there are three generations, with a mix of 1st and 2nd generation in the fleet that year)
+    inflow = np.zeros((len(demand), capacity.shape[1]))  # timeline array like fleet, but only showing units entering service
+    outflow = np.zeros((len(demand), capacity.shape[1])) # timeline array like fleet, but only showing units being decomissioned
+    # start by building the fleet as we expect it in the starting year (based on demand)
+    # fleet_age has dimensions (age, model): the summation over ages is equal to the fleet in that year. distributed by age to enable fleet renewal modeling.
+    ages_here = np.array(ages_0[:max_age], dtype = float)[::-1, np.newaxis] # more recent units have lowest row (= lowest age)
+    entries_here = entries_0[::-1]
+    fleet_use = ages_here*capacity[0]*entries_here # temporary array to characterise use of fleet to meet demand
+    x_0 = demand[0]/np.nansum(fleet_use, axis = 0).sum() # this is the factor with which the initial fleet will have to be scaled, after having built a preliminary fleet above, based on the initial age distribution
+    fleet_age = ages_here*x_0*entries_here
+    
+    # sums skip missing values, which occur if the starting fleet is empty and x_0 cannot be determined
+    fleet[0] = np.nansum(fleet_age, axis = 0)
+    # create initial values for inflow and outflow (for outflow: assumption that decommissioning of year 1 is equal to year 0)
+    inflow[0] = fleet_age[0]
+    outflow[0] = fleet_age[-1]
+    
+    # create fleet for subsequent years, again based on what would be needed to meet demand
+    for t in range(1, len(demand)): # we already created the first year (start year) above with entries_0 and ages_0
+        outflow[t] = fleet_age[-1] # add units about to be decommissioned to outflow list
+        fleet_age[1:] = fleet_age[:-1] # all units become 1 year older, oldest units are removed
+        fleet_age[0] = 0 # add a row for any potential new units
+        demand_before = np.nansum(fleet_age*capacity[t], axis = 0).sum()
+        if demand_before < demand[t]: # add new units to the fleet to meet demand
+            fleet_age[0] = (demand[t] - demand_before)*entries_t[t]/capacity[t]
+        inflow[t] = fleet_age[0] # add units entering service to inflow list
+        fleet[t] = np.nansum(fleet_age, axis = 0)
+    
+    return fleet, inflow, outflow
+
 #%% fleet builder: build fleet in terms of number and types of aircraft servicing a particular RPK time series
 def build_fleet(aircraft_char, max_age_0, ages_0, rpk, occupation, y_start, h2_share):
     entries_0 = entry_list(aircraft_char, y_start - max_age_0, y_start, h2_share)   # list of aircraft (per age) in the starting fleet
-    entries_t = entry_list(aircraft_char, y_start, y_start + len(rpk), h2_share) # list of which aircraft comes into the fleet, starting from 
-    fleet = []          # timeline list where each entry is the number of aircraft of each generation in the fleet (e.g.: [100, 10, 0] shows that there are three aircraft generations, with a mix of 1st and 2nd generation in the fleet that year)
-    inflow = []         # timeline list like fleet, but only showing aircraft entering service
-    outflow = []        # timeline list like fleet, but only showing aircraft being decomissioned
-    fleet_age = pd.DataFrame(columns = aircraft_char.columns) # summation of the dataframe is equal to entries of the fleet list. distributed by age to enable fleet renewal modeling.
-    # start by building the fleet as we expect it in the starting year (based on demand)
-    fleet_use = pd.DataFrame(columns = aircraft_char.columns) # temporary dataframe to characterise use of fleet to meet RPK
-    for i in range(max_age_0): 
-        fleet_use.loc[-1] = [0]*len(aircraft_char.columns) # adding a row
-        fleet_use.index = fleet_use.index + 1  # shifting index
-        fleet_use.sort_index(inplace=True)  # more recent aircraft now has lowest index (= lowest age)
-        fleet_use.loc[0] = ages_0[i]*aircraft_char.loc['seats']*aircraft_char.loc['yearly distance']*occupation[0]*entries_0.loc[i]
-    
-    x_0 = rpk[0]/fleet_use.sum().sum() # this is the factor with which the initial fleet will have to be scaled, after having built a preliminary fleet above, based on the initial age distribution
-    
-    for i in range(max_age_0): 
-        fleet_age.loc[-1] = [0]*len(aircraft_char.columns) # adding a row
-        fleet_age.index = fleet_age.index + 1  # shifting index
-        fleet_age.sort_index(inplace=True) # more recent aircraft now has lowest index (= lowest age)
-        fleet_age.loc[0] = ages_0[i]*x_0*entries_0.loc[i]
+    entries_t = entry_list(aircraft_char, y_start, y_start + len(rpk), h2_share) # list of which aircraft comes into the fleet, starting from y_start
+    # RPK per aircraft, per year
+    capacity = (aircraft_char.loc['seats']*aircraft_char.loc['yearly distance']).to_numpy(dtype = float)*np.array(occupation[:len(rpk)], dtype = float)[:, np.newaxis]
+    fleet, inflow, outflow = build_stock(capacity, entries_0, entries_t, ages_0, rpk)
         
-    fleet.append(fleet_age.sum())
-    
-    # create initial values for inflow and outflow (for outflow: assumption that decommissioning of year 1 is equal to year 0)
-    inflow.append(fleet_age.loc[0])
-    outflow.append(fleet_age.loc[max_age_0-1])
-    
-    # create fleet for subsequent years, again based on what would be needed to meet RPK
-    for t in range(len(rpk)-1):
-        t = t+1 # we already created the first year (start year) above with entries_0 and ages_0
-        rpk_here = rpk[t]
-        fleet_age.index = fleet_age.index + 1 # all aircraft become 1 year older
-        outflow.append(fleet_age.loc[max_age_0]) # add aircraft about to be decommissioned to outflow list
-        fleet_age.drop(max_age_0, inplace=True) # get rid of old aircraft
-        rpk_before = fleet_age*aircraft_char.loc['seats']*aircraft_char.loc['yearly distance']*occupation[t]
-        rpk_before = rpk_before.sum().sum()
-        fleet_age.loc[0] = [0]*len(aircraft_char.columns) # add a row for any potential new aircraft
-        if rpk_before < rpk_here: # add new aircraft to the fleet to meet RPK
-            fleet_age.loc[0] = (rpk_here - rpk_before)*entries_t.iloc[t]/(aircraft_char.loc['seats']*aircraft_char.loc['yearly distance']*occupation[t])
-        inflow.append(fleet_age.loc[0]) # add aircraft entering service to inflow list
-        fleet_age.sort_index(inplace=True) # sort dataframe to have ages chronological (not strictly required, but handy)
-        fleet.append(fleet_age.sum())
-        
-    # now, fleet, inflow and outflow are set up as a list of series. convert these to dataframes, which are much more convenient.
-    fleet = pd.DataFrame(fleet)
-    fleet.index = list(range(len(rpk)))
-    inflow = pd.DataFrame(inflow)
-    inflow.index = list(range(len(rpk)))    
-    outflow = pd.DataFrame(outflow)
-    outflow.index = list(range(len(rpk)))    
+    # convert fleet, inflow and outflow to dataframes, which are much more convenient
+    fleet = pd.DataFrame(fleet, index = list(range(len(rpk))), columns = aircraft_char.columns)
+    inflow = pd.DataFrame(inflow, index = list(range(len(rpk))), columns = aircraft_char.columns)
+    outflow = pd.DataFrame(outflow, index = list(range(len(rpk))), columns = aircraft_char.columns)
         
     return fleet, inflow, outflow
 
-#%% allocate time-specific LCIA values to a timeline-based dataframe specifying economic flows
-def allocate_LCIA(y_start, process, process_timeline, input_dict):
+#%% batched allocation: multiply a (year, item) array of process quantities with a (year, item, impact category) array of LCI(A) data
+def allocate_LCIA_array(process_quantities, process_data):
+    return process_quantities[:, :, np.newaxis]*process_data
+
+#%% allocate time-specific LCIA values to a timeline-based dataframe specifying economic flows, as a (year, item, impact category) array
+def allocate_LCIA_items(y_start, process, process_timeline, input_dict):
+    years = range(y_start, y_start + len(process_timeline))
+    process_data = input_dict.process_data(process, process_timeline.columns, years) # get the LCIA data from the input_dict for the right aircraft and time
+    return allocate_LCIA_array(process_timeline.to_numpy(dtype = float), process_data)
+
+#%% turn a (year, item, impact category) array of LCIA results into a dictionary with a dataframe per year
+def LCIA_array_to_dic(LCIA_array, y_start, process, items, impact_categories):
     LCIA_dict = {}
-    for i in range(len(process_timeline)):
-        year_here = y_start + i
-        process_quant = process_timeline.iloc[i]
-        process_result = []
-        for j in range(len(process_timeline.columns)):
-            item = process_timeline.columns[j]
-            process_data = input_dict[format_scenario_name(item,year_here)].loc[process] # get the LCIA data from the input_dict for the right aircraft and time
-            process_result.append(process_quant[j]*process_data)
-        process_dataframe = pd.DataFrame(process_result)
-        process_dataframe.index = process_timeline.columns
-        LCIA_dict[format_scenario_name(process,year_here)] = process_dataframe
+    for i in range(len(LCIA_array)):
+        LCIA_dict[format_scenario_name(process,y_start + i)] = pd.DataFrame(LCIA_array[i], index = items, columns = impact_categories)
     return LCIA_dict
 
-# %%fleet user: takes the fleet timeline df and translates it into fuel use dfs, divided into fuel used during LTO and during CCD 
-def use_fleet(fleet, flight_distance, rpk, occupation, aircraft_char, j):
+#%% allocate time-specific LCIA values to a timeline-based dataframe specifying economic flows (returned as a dictionary with a dataframe per year)
+def allocate_LCIA(y_start, process, process_timeline, input_dict):
+    LCIA_array = allocate_LCIA_items(y_start, process, process_timeline, input_dict)
+    return LCIA_array_to_dic(LCIA_array, y_start, process, process_timeline.columns, input_dict.impact_categories)
 
-    yearly_distance = aircraft_char.loc['yearly distance']
-    LTO_fuel = aircraft_char.loc['LTO fuel']
-    CCD_fuel = aircraft_char.loc['reference flight CCD fuel'].apply(lambda x: x[j]) # make sure that the right CCD fuel value is taken for these flights (based on i from previous function)
+#%% like allocate_LCIA, but summed over all items into a (year, impact category) array
+# if a dictionary is passed as contributions, the results per item are added to it under the process name (as returned by allocate_LCIA), for contribution analysis
+def allocate_LCIA_total(y_start, process, process_timeline, input_dict, contributions = None):
+    LCIA_array = allocate_LCIA_items(y_start, process, process_timeline, input_dict)
+    if contributions is not None:
+        contributions[process] = LCIA_array_to_dic(LCIA_array, y_start, process, process_timeline.columns, input_dict.impact_categories)
+    return np.nansum(LCIA_array, axis = 1) # missing values are skipped, as pandas does
+
+# %%fleet user: takes the fleet timeline df and translates it into fuel use dfs, divided into fuel used during LTO and during CCD 
+def use_fleet(fleet, flight_distance, rpk, occupation, aircraft_char, j, as_arrays = False):
+    aircraft_char = aircraft_char.loc[:, fleet.columns]
+    yearly_distance = aircraft_char.loc['yearly distance'].to_numpy(dtype = float)
+    seats = aircraft_char.loc['seats'].to_numpy(dtype = float)
+    LTO_fuel = aircraft_char.loc['LTO fuel'].to_numpy(dtype = float)
+    CCD_fuel = aircraft_char.loc['reference flight CCD fuel'].apply(lambda x: x[j]).to_numpy(dtype = float) # make sure that the right CCD fuel value is taken for these flights (based on i from previous function)
     
     CCD_fuel_per_km = CCD_fuel/flight_distance # including this here now -- potentially this section of the model can be made more sophisticated
     
-    LTO_fuel_timeline = [] # timeline list where each entry shows how much fuel (in MJ) is used for LTO per aircraft
-    CCD_fuel_timeline = [] # timeline list where each entry shows how much fuel (in MJ) is used for CCD per aircraft
-    for i in fleet.index:
-        rpk_capacity = fleet.loc[i]*aircraft_char.loc['yearly distance']*aircraft_char.loc['seats']*occupation[i]
-        rpk_demand = rpk[i]
-        rpk_adjustment = rpk_demand/(rpk_capacity.sum())
-        flights_here = fleet.loc[i]*yearly_distance*rpk_adjustment/flight_distance # number of flights each aircraft type takes, based on usage estimates
-        fuel_LTO_here = flights_here*LTO_fuel # MJ fuel for LTO per aircraft type in this year
-        fuel_CCD_here = flights_here*flight_distance*CCD_fuel_per_km # MJ fuel for CCD per aircraft type in this year
-        LTO_fuel_timeline.append(fuel_LTO_here)
-        CCD_fuel_timeline.append(fuel_CCD_here)
-    
-    LTO_fuel_timeline = pd.DataFrame(LTO_fuel_timeline)
-    LTO_fuel_timeline.index = fleet.index
-    CCD_fuel_timeline = pd.DataFrame(CCD_fuel_timeline)
-    CCD_fuel_timeline.index = fleet.index
+    # all as (year, aircraft) arrays
+    fleet_values = fleet.to_numpy(dtype = float)
+    rpk_capacity = fleet_values*yearly_distance*seats*np.asarray(occupation, dtype = float)[:, None]
+    rpk_adjustment = np.asarray(rpk, dtype = float)/row_sums(rpk_capacity)
+    flights = fleet_values*yearly_distance*rpk_adjustment[:, None]/flight_distance # number of flights each aircraft type takes, based on usage estimates
+    LTO_fuel_timeline = flights*LTO_fuel # MJ fuel for LTO per aircraft type in each year
+    CCD_fuel_timeline = flights*flight_distance*CCD_fuel_per_km # MJ fuel for CCD per aircraft type in each year
+    if as_arrays: return LTO_fuel_timeline, CCD_fuel_timeline
+    
+    LTO_fuel_timeline = pd.DataFrame(LTO_fuel_timeline, index = fleet.index, columns = fleet.columns)
+    CCD_fuel_timeline = pd.DataFrame(CCD_fuel_timeline, index = fleet.index, columns = fleet.columns)
     
     return LTO_fuel_timeline, CCD_fuel_timeline
 
 #%% AAF timeline builder: turns a dataframe of SAF milestones into a year-by-year timeline
 # note that there is a possible edge case not accounted for, which is if aaf_0 falls after a goal_year but does not meet the goal for that year.
 def aaf_share_list(y_start, y_stop, aaf_0, aaf_milestones, aircraft_char, LTO_fuel, CCD_fuel, no_decreases):
-    aaf_goal_timeline = [aaf_0] # prime timeline, starting with share in initial year
-    year_next = y_start + 1 # the year following, for which we determine what the share should be to be on track with the milestones
-    aaf_now = aaf_0 # the share in the year previous to "year_next"
-    for index, row in aaf_milestones.iterrows():
-        goal_year = row.loc['year']
-        goal_share = row.loc['AAF share']
-        while year_next <= goal_year:
-            if aaf_now < goal_share: 
-                aaf_next = aaf_now + (goal_share - aaf_now)/(goal_year - year_next + 1)
-            else: aaf_next = aaf_now
-            aaf_goal_timeline.append(aaf_next)
-            aaf_now = aaf_next
-            year_next += 1
-    # in the case that the end year reaches beyond the timeline of goals, repeat the final goal to match length
-    while year_next <= y_stop:
-        aaf_goal_timeline.append(aaf_next)
-        year_next += 1
-    # in the case that the end year is reached before the timeline of goals, shorten the timeline list
-    if year_next > y_stop: aaf_goal_timeline = aaf_goal_timeline[:y_stop - y_start + 1]
+    # timeline of goals, starting with share in initial year; in the following years, the share should be on track with the milestones (but does not decrease)
+    aaf_goal_timeline = [aaf_0] + list(milestone_timeline(aaf_milestones.loc[:, 'year'], aaf_milestones.loc[:, 'AAF share'], aaf_0, y_start + 1, y_stop, increase_only = True))
     
     # next part of the function: based on the amount of hydrogen planes flying, determine what the share of hydrogen is in the fuel mix 
     aircraft_char = aircraft_char.T
-    hc_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrocarbon'])].index
     h2_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrogen'])].index
-    hydrogen_share = []
-    year_here = y_start
-    for i in LTO_fuel.index:
-        hydrogen_share_here = (LTO_fuel.loc[i,h2_aircraft].sum() + CCD_fuel.loc[i,h2_aircraft].sum())/(LTO_fuel.loc[i, :].sum() + CCD_fuel.loc[i, :].sum())
-        hydrogen_share.append(hydrogen_share_here)
+    hydrogen_share = (row_sums(LTO_fuel.loc[:, h2_aircraft]) + row_sums(CCD_fuel.loc[:, h2_aircraft]))/(row_sums(LTO_fuel) + row_sums(CCD_fuel))
+    hydrogen_share = list(hydrogen_share)
     
     # final part of the function: determine how much of the hydrocarbon fuel share should be SAF in order to meet the AAF share goal timeline
     missing_share = np.subtract(aaf_goal_timeline, hydrogen_share)
-    missing_share = np.array([0 if i < 0 else i for i in missing_share])
+    missing_share[missing_share < 0] = 0
     notice = [] # list of years to print in case no_decreases is False and SAF share decreases
-    for i in range(len(missing_share) - 1):
-        if missing_share[i] > missing_share[i+1]:
-            if no_decreases == True:
-                missing_share[i+1] = missing_share[i]
-            else: notice.append(y_start+i+1)
+    if no_decreases == True:
+        missing_share = np.fmax.accumulate(missing_share) # fmax, so that a year without any fuel use (NaN) does not end the running maximum
+    else: notice = (np.flatnonzero(missing_share[:-1] > missing_share[1:]) + y_start + 1).tolist()
     
-    saf_share = np.array([missing_share[i]*1/(1- hydrogen_share[i]) for i in range(len(missing_share))])
+    saf_share = missing_share*1/(1 - np.array(hydrogen_share))
     saf_share[np.isnan(saf_share)] = 0
     
     if len(notice) != 0: logging.info(f"Instance(s) of SAF share in total fuel decreasing dectected in year(s): {notice}")
     
     return aaf_goal_timeline, hydrogen_share, saf_share
 
+# sums of the rows of a dataframe or 2D array, skipping NaN values (like pandas does), in the same order of summation as when summing each row separately
+def row_sums(values):
+    return np.nansum(np.ascontiguousarray(np.asarray(values, dtype = float)), axis = 1)
+
+# timeline which moves towards each (year, value) milestone in equal steps, from value_0 in the year before y_next, for the years y_next to y_stop
+# after the last milestone, its value is repeated; if increase_only, the value is kept constant towards milestones below the current value
+# each step is taken from the previous value (rather than calculated directly), so that the timeline is identical to that of the original year-by-year functions
+def milestone_timeline(milestone_years, milestone_values, value_0, y_next, y_stop, increase_only = False):
+    n_years = y_stop - y_next + 1
+    timeline = []
+    value_now = value_0 # the value in the year previous to "y_next"
+    for goal_year, goal_value in zip(milestone_years, milestone_values):
+        while y_next <= goal_year:
+            if not increase_only or value_now < goal_value:
+                value_now = value_now + (goal_value - value_now)/(goal_year - y_next + 1)
+            timeline.append(value_now)
+            y_next += 1
+    # in the case that the end year reaches beyond the timeline of goals, repeat the final value to match length; if it is reached before, shorten the timeline
+    timeline += [value_now]*(n_years - len(timeline))
+    
+    return np.array(timeline[:n_years], dtype = float)
+
 #%% function that takes the fuel shares and total fuel use as inputs and creates seperate dataframes for each fuel
-def fuel_quantities(aircraft_char, fuel, hydrogen_share, saf_share):
+def fuel_quantities(aircraft_char, fuel, hydrogen_share, saf_share, as_arrays = False):
     aircraft_char = aircraft_char.T
     hc_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrocarbon'])].index
     h2_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrogen'])].index
     
-    fuel_fossil = []
-    fuel_saf = []
-    fuel_hydrogen = []
-    for i in range(len(fuel)):
-        fuel_fossil.append(fuel.loc[i,hc_aircraft]*(1 - saf_share[i]))
-        fuel_saf.append(fuel.loc[i,hc_aircraft]*saf_share[i])
-        fuel_hydrogen.append(fuel.loc[i,h2_aircraft])
+    # all as (year, aircraft) arrays
+    fuel_hc = fuel.loc[:, hc_aircraft].to_numpy(dtype = float)
+    saf_share = np.asarray(saf_share, dtype = float)[:, None]
+    fuel_fossil = fuel_hc*(1 - saf_share)
+    fuel_saf = fuel_hc*saf_share
+    fuel_hydrogen = fuel.loc[:, h2_aircraft].to_numpy(dtype = float)
+    if as_arrays: return fuel_fossil, fuel_saf, fuel_hydrogen
         
-    fuel_fossil = pd.DataFrame(fuel_fossil)
-    fuel_fossil.index = fuel.index
-    fuel_saf = pd.DataFrame(fuel_saf)
-    fuel_saf.index = fuel.index
-    fuel_hydrogen = pd.DataFrame(fuel_hydrogen)
-    fuel_hydrogen.index = fuel.index
+    fuel_fossil = pd.DataFrame(fuel_fossil, index = fuel.index, columns = hc_aircraft)
+    fuel_saf = pd.DataFrame(fuel_saf, index = fuel.index, columns = hc_aircraft)
+    fuel_hydrogen = pd.DataFrame(fuel_hydrogen, index = fuel.index, columns = h2_aircraft)
     
     return fuel_fossil, fuel_saf, fuel_hydrogen
 
 #%% like entry_list, but for fuel plants
 def fuel_entry_list(plant_char, y_start, y_stop):
-    entries = []
-    for t in range(y_stop-y_start):
-        y_here = t + y_start # from t (position in time series) to y_here (current year)
-        req_eis = plant_char.loc['EIS'] <= y_here # filter out aircraft not entering service yet
-        chosen_plant = plant_char.loc['EIS'] == max(req_eis*plant_char.loc['EIS'])
-        # create list of most recent model(s), taking into account split between HC and H2 (based on RPK)
-        entries.append(1*chosen_plant)
-        
-    entries = pd.DataFrame(entries)
-    entries.index = list(range(y_stop-y_start))
-    return entries
+    return entry_matrix(tuple(plant_char.loc['EIS']), (0,)*len(plant_char.columns), y_start, y_stop)
 
 #%% based on the fuels needed to power aircraft, determine what the fuel production fleets look like
 def fuel_fleet_builder(plant_char, ages_0, max_age, total_fuel, y_start, y_stop, production_index):
     entries_0 = fuel_entry_list(plant_char, y_start - max_age, y_start)   # list of plants (per age) in the starting fleet
     entries_t = fuel_entry_list(plant_char, y_start, y_start + len(total_fuel)) # list of which plants comes into the fleet
-    fleet = []          
-    inflow = []         
-    outflow = []
-    fleet_age = pd.DataFrame(columns = plant_char.columns) # summation of the dataframe is equal to entries of the fleet list. distributed by age to enable fleet renewal modeling.
-    # start by building the fleet as we expect it in the starting year (based on demand)
-    fleet_use = pd.DataFrame(columns = plant_char.columns) # temporary dataframe to characterise use of fleet to meet MJ H2 demand
-    for i in range(max_age): 
-        fleet_use.loc[-1] = [0]*len(plant_char.columns) # adding a row
-        fleet_use.index = fleet_use.index + 1  # shifting index
-        fleet_use.sort_index(inplace=True)  # more recent aircraft now has lowest index (= lowest age)
-        fleet_use.loc[0] = ages_0[i]*plant_char.loc[production_index]*entries_0.loc[i]
-    
-    x_0 = total_fuel[0]/fleet_use.sum().sum() # this is the factor with which the initial fleet will have to be scaled, after having built a preliminary fleet above, based on the initial age distribution
-    
-    for i in range(max_age): 
-        fleet_age.loc[-1] = [0]*len(plant_char.columns) # adding a row
-        fleet_age.index = fleet_age.index + 1  # shifting index
-        fleet_age.sort_index(inplace=True) # more recent aircraft now has lowest index (= lowest age)
-        fleet_age.loc[0] = ages_0[i]*x_0*entries_0.loc[i]
-    
-    fleet.append(fleet_age.sum())
-    
-    # create initial values for inflow and outflow (for outflow: assumption that decommissioning of year 1 is equal to year 0)
-    inflow.append(fleet_age.loc[0])
-    outflow.append(fleet_age.loc[max_age-1])
-    
-    # create fleet for subsequent years, again based on what would be needed to meet MJ H2 demand
-    for t in range(len(total_fuel)-1):
-        t = t+1 # we already created the first year (start year) above with entries_0 and ages_0
-        mj_here = total_fuel[t]
-        fleet_age.index = fleet_age.index + 1 # all plants become 1 year older
-        outflow.append(fleet_age.loc[max_age]) # add plants about to be decommissioned to outflow list
-        fleet_age.drop(max_age, inplace=True) # get rid of old plants
-        mj_before = fleet_age*plant_char.loc[production_index]
-        mj_before = mj_before.sum().sum()
-        fleet_age.loc[0] = [0]*len(plant_char.columns) # add a row for any potential new plants
-        if mj_before < mj_here: # add new plants to the fleet to meet MJ H2 demand
-            fleet_age.loc[0] = (mj_here - mj_before)*entries_t.iloc[t]/plant_char.loc[production_index]
-        inflow.append(fleet_age.loc[0]) # add plants entering service to inflow list
-        fleet_age.sort_index(inplace=True) # sort dataframe to have ages chronological (not strictly required, but handy)
-        fleet.append(fleet_age.sum())
+    # production per plant, which is the same in each year
+    capacity = np.broadcast_to(plant_char.loc[production_index].to_numpy(dtype = float), (len(total_fuel), len(plant_char.columns)))
+    fleet, inflow, outflow = build_stock(capacity, entries_0, entries_t, ages_0, total_fuel)
         
-    # now, fleet, inflow and outflow are set up as a list of series. convert these to dataframes, which are much more convenient.
-    fleet = pd.DataFrame(fleet)
-    fleet.index = list(range(len(total_fuel)))
-    inflow = pd.DataFrame(inflow)
-    inflow.index = list(range(len(total_fuel)))    
-    outflow = pd.DataFrame(outflow)
-    outflow.index = list(range(len(total_fuel)))    
+    # convert fleet, inflow and outflow to dataframes, which are much more convenient
+    fleet = pd.DataFrame(fleet, index = list(range(len(total_fuel))), columns = plant_char.columns)
+    inflow = pd.DataFrame(inflow, index = list(range(len(total_fuel))), columns = plant_char.columns)
+    outflow = pd.DataFrame(outflow, index = list(range(len(total_fuel))), columns = plant_char.columns)
     
     return fleet, inflow, outflow
 
-#%% function to isolate one impact category from dictionary of results
-def impact_cat_result(LCIA_result, impact_cat):
-    result = []
-    for key, df in LCIA_result.items(): result.append(df[impact_cat].sum())
-    return np.array(result)
-
-#%% cirrus calculator: calculate how much cirrus is produced
-# expressed in fossil cirrus km-eq, so relative to the RF which would be caused by aircraft flying on fossil kerosene
-def cirrus_calc(hydrogen_share, saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=False):
+#%% cirrus calculator: calculate how much cirrus is produced, and how the fuel mix changes contrail impacts
+# single pass over the fleet, which returns (as arrays over years):
+# - the cirrus produced, expressed in fossil cirrus km-eq, so relative to the RF which would be caused by aircraft flying on fossil kerosene (used for LWE)
+# - the same for the sensitivity analysis which assumes that AAF does not influence cirrus impacts, which is the total distance
+# - the correction factor of contrail impacts for the fuel mix (used for GWP*), and the same for the sensitivity analysis, which is 1
+# - the total distance flown
+def cirrus_kernel(saf_share, fleet, aircraft_char, cirrus_rf_change_h2):
     h2_fossil = 13.73 # hydrogen content of fossil kerosene
     h2_saf = 15.29 # hydrogen content of SAF
     # estimate of ice particle number based on fuel mix
@@ -468,227 +537,215 @@ def cirrus_calc(hydrogen_share, saf_share, fleet, aircraft_char, cirrus_rf_chang
     # based on estimated change in ice particles, estimate change in cirrus RF
     ice_particles_change = 1 - ice_particles/ice_particles[0]
     cirrus_rf_change = 1 - 0.048*19.2**ice_particles_change
-    distance_total = fleet*aircraft_char.loc['yearly distance']
-    # figure out how much the km-eq value is based on distance of hydrocarbon aircraft
-    aircraft_char = aircraft_char.T
-    hc_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrocarbon'])].index
-    h2_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrogen'])].index
-    if no_aaf_change == False:
-        cirrus_eq = []
-        for i in range(len(distance_total)):
-            cirrus_here = distance_total.iloc[i].loc[hc_aircraft].sum()*cirrus_rf_change[i] + distance_total.iloc[i].loc[h2_aircraft].sum()*cirrus_rf_change_h2
-            cirrus_eq.append(cirrus_here)
-    # sensitivity analysis which assumes that AAF does not influence cirrus impacts
-    if no_aaf_change == True:
-        cirrus_eq = []
-        for i in range(len(distance_total)):
-            cirrus_here = distance_total.iloc[i].sum()
-            cirrus_eq.append(cirrus_here)
-
-    return cirrus_eq
-
-def calc_cirrus_change(saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=False):
-    if no_aaf_change == True: cirrus_change = pd.Series([1]*len(fleet))
-    else: 
-        h2_fossil = 13.73 # hydrogen content of fossil kerosene
-        h2_saf = 15.29 # hydrogen content of SAF
-        # estimate of ice particle number based on fuel mix
-        mix = np.array(saf_share)
-        h2_mix = h2_fossil*(1-mix) + h2_saf*mix
-        ice_particles = 9.407e23*np.e**(np.log(0.2475)*h2_mix)
-        # based on estimated change in ice particles, estimate change in cirrus RF
-        ice_particles_change = 1 - ice_particles/ice_particles[0]
-        cirrus_rf_change = 1 - 0.048*19.2**ice_particles_change
-        distance_total = fleet*aircraft_char.loc['yearly distance']
-        # figure out how much the km-eq value is based on distance of hydrocarbon aircraft
-        aircraft_char = aircraft_char.T
-        hc_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrocarbon'])].index
-        h2_aircraft = aircraft_char.loc[aircraft_char['fuel type'].isin(['hydrogen'])].index
-        hc_distance = distance_total[hc_aircraft].sum(axis=1)
-        h2_distance = distance_total[h2_aircraft].sum(axis=1)
-        cirrus_change = (
-            hc_distance.values * cirrus_rf_change + 
-            h2_distance.values * cirrus_rf_change_h2
-        ) / distance_total.sum(axis=1).values
-
-    return pd.Series(cirrus_change)
-
-def perform_GWPstar_calc(flight_start_year, flight_end_year, lwe_input, distance_total, fuel_effect_correction_contrails):
-    # prepare objects
-    params = ModelParameters(flight_start_year, flight_end_year)
-    ERF_co2 = SimplifiedERFCo2(parameters=params)
-    ERF_nox = ERFNox(parameters=params)
-    ERF_other = ERFOthers(parameters=params)
-    ERF_extra = ERFExtra(parameters=params)
-    years = ERF_co2.years
+    # split distance into that of hydrocarbon and hydrogen aircraft
+    distance = fleet*aircraft_char.loc['yearly distance']
+    fuel_type = aircraft_char.loc['fuel type'].reindex(distance.columns).to_numpy() # multiplication aligns (and may reorder) the aircraft
+    distance = distance.to_numpy(dtype = float)
+    hc_distance = np.nansum(distance[:, fuel_type == 'hydrocarbon'], axis = 1)
+    h2_distance = np.nansum(distance[:, fuel_type == 'hydrogen'], axis = 1)
+    distance_total = np.nansum(distance, axis = 1)
+    # the km-eq value is based on distance of hydrocarbon aircraft
+    cirrus_eq = hc_distance*cirrus_rf_change + h2_distance*cirrus_rf_change_h2
+    cirrus_change = cirrus_eq/distance_total
 
-    # extract emissions, including contrail fuel correction -- note that emissions should be in Tg, except for contrails (km)
-    co2_emissions = pd.Series((lwe_input.iloc[:, 12].values + lwe_input.iloc[:, 13].values)* 1e-9, index=years)
-    nox_emissions = pd.Series(lwe_input.iloc[:, 14].values * 1e-9, index=years)
-    soot_emissions = pd.Series(lwe_input.iloc[:, 15].values * 1e-9, index=years)
-    h2o_emissions = pd.Series(lwe_input.iloc[:, 17].values * 1e3 * 1e-9, index=years) # from m3 to Tg
-    sulfur_emissions = pd.Series(lwe_input.iloc[:, 16].values * 1e-9, index=years)
-    ch4_emissions = pd.Series(lwe_input.iloc[:, 5].values * 1e-9, index=years)
-    h2_emissions = pd.Series(lwe_input.iloc[:, 2].values * 1e-9, index=years)
+    return cirrus_eq, distance_total, cirrus_change, np.ones(len(distance_total)), distance_total
 
-    total_aircraft_distance = pd.Series(distance_total.values, index=years)
-    operations_contrails_gain =pd.Series([0]*len(lwe_input), index=years)
-    fuel_effect_correction_contrails = pd.Series(fuel_effect_correction_contrails.values, index=years)
+# expressed in fossil cirrus km-eq, see cirrus_kernel
+def cirrus_calc(hydrogen_share, saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=False):
+    cirrus_eq, cirrus_eq_no_aaf_change, _, _, _ = cirrus_kernel(saf_share, fleet, aircraft_char, cirrus_rf_change_h2)
+    return cirrus_eq_no_aaf_change if no_aaf_change else cirrus_eq
 
-    # calculate ERF for emissions
-    annual_co2_erf, co2_erf = ERF_co2.compute(co2_emissions)
-    nox_short_term_o3_increase_erf, nox_long_term_o3_decrease_erf, nox_ch4_decrease_erf, nox_stratospheric_water_vapor_decrease_erf, nox_erf = ERF_nox.compute(nox_emissions, erf_coefficient_nox_short_term_o3_increase, erf_coefficient_nox_long_term_o3_decrease, erf_coefficient_nox_ch4_decrease, erf_coefficient_nox_stratospheric_water_vapor_decrease)
-    contrails_erf, soot_erf, h2o_erf, sulfur_erf, aerosol_erf = ERF_other.compute(soot_emissions, h2o_emissions, sulfur_emissions, erf_coefficient_contrails, erf_coefficient_soot, erf_coefficient_h2o, erf_coefficient_sulfur, total_aircraft_distance, operations_contrails_gain, fuel_effect_correction_contrails)
-    ch4_erf, h2_erf = ERF_extra.compute(ch4_emissions, h2_emissions, erf_coefficient_ch4, erf_coefficient_h2)
+# correction factor of contrail impacts for the fuel mix, see cirrus_kernel
+def calc_cirrus_change(saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=False):
+    _, _, cirrus_change, cirrus_change_no_aaf_change, _ = cirrus_kernel(saf_share, fleet, aircraft_char, cirrus_rf_change_h2)
+    return pd.Series(cirrus_change_no_aaf_change if no_aaf_change else cirrus_change)
 
-    # combine results for next step
-    df_climate = pd.concat([ERF_co2.df_climate, ERF_nox.df_climate, ERF_other.df_climate, ERF_extra.df_climate], axis=1)
-    total_erf = co2_erf + contrails_erf + h2o_erf + nox_erf + soot_erf + sulfur_erf + ch4_erf + h2_erf
-    df_climate["total_erf"] = total_erf
-    climate_calc = TemperatureGWPStar(parameters=params)
-    climate_calc.df_climate = df_climate
+# GWP* climate results (df_climate) of a single scenario, calculated with perform_GWPstar_calc_batch
+# emissions can be an EmissionsRecord, or a dataframe in the format of emissions_from_dataframe
+def perform_GWPstar_calc(flight_start_year, flight_end_year, emissions, distance_total, fuel_effect_correction_contrails):
+    if not isinstance(emissions, EmissionsRecord):
+        emissions = emissions_from_dataframe(emissions, flight_start_year, flight_end_year)
+    
+    GWPstar_batch = perform_GWPstar_calc_batch(flight_start_year, flight_end_year, stack_emissions([emissions]), np.asarray(distance_total, dtype = float)[None], np.asarray(fuel_effect_correction_contrails, dtype = float)[None])
+    return GWPstar_batch.loc[0].rename_axis(None)
 
-    # calculate temperature change
-    climate_calc_results = climate_calc.compute(
-        contrails_gwpstar_variation_duration,
-        contrails_gwpstar_s_coefficient,
-        nox_short_term_o3_increase_gwpstar_variation_duration,
-        nox_short_term_o3_increase_gwpstar_s_coefficient,
-        nox_long_term_o3_decrease_gwpstar_variation_duration,
-        nox_long_term_o3_decrease_gwpstar_s_coefficient,
-        nox_ch4_decrease_gwpstar_variation_duration,
-        nox_ch4_decrease_gwpstar_s_coefficient,
-        nox_stratospheric_water_vapor_decrease_gwpstar_variation_duration,
-        nox_stratospheric_water_vapor_decrease_gwpstar_s_coefficient,
-        soot_gwpstar_variation_duration,
-        soot_gwpstar_s_coefficient,
-        h2o_gwpstar_variation_duration,
-        h2o_gwpstar_s_coefficient,
-        sulfur_gwpstar_variation_duration,
-        sulfur_gwpstar_s_coefficient,
-        contrails_erf,
-        nox_short_term_o3_increase_erf,
-        nox_long_term_o3_decrease_erf,
-        nox_ch4_decrease_erf,
-        nox_stratospheric_water_vapor_decrease_erf,
-        soot_erf,
-        h2o_erf,
-        sulfur_erf,
-        co2_erf,
-        total_erf,
-        co2_emissions,
-        tcre_coefficient,
-        ch4_gwpstar_variation_duration,
-        ch4_gwpstar_s_coefficient,
-        ch4_erf,
-        h2_gwpstar_variation_duration,
-        h2_gwpstar_s_coefficient,
-        h2_erf,
+# batched version of perform_GWPstar_calc, for several scenarios at once
+# takes emissions as a (scenario, substance, year) array in the same format as emissions_to_LWE_batch, and distances and contrail corrections as (scenario, year) arrays
+# inputs with a single scenario are broadcast against the others, so contrail variants of the same emissions can be calculated by passing the emissions once
+# returns the df_climate results of all scenarios as a single dataframe with a (scenario, year) MultiIndex
+def perform_GWPstar_calc_batch(flight_start_year, flight_end_year, emissions, distance_total, fuel_effect_correction_contrails):
+    emissions = np.asarray(emissions, dtype=float)
+    def substance(name):
+        return emissions[:, LWE_substances.index(name)]
+    
+    # extract emissions -- note that emissions should be in Tg, except for contrails (km)
+    return gwpstar_climate_batch(
+        flight_start_year,
+        flight_end_year,
+        co2_emissions = (substance('CO2') + substance('CO2 (flight)'))* 1e-9,
+        nox_emissions = substance('NOx') * 1e-9,
+        soot_emissions = substance('BC') * 1e-9,
+        h2o_emissions = substance('H2O') * 1e3 * 1e-9, # from m3 to Tg
+        sulfur_emissions = substance('SOx') * 1e-9,
+        ch4_emissions = substance('CH4') * 1e-9,
+        h2_emissions = substance('H') * 1e-9,
+        total_aircraft_distance = np.asarray(distance_total, dtype=float),
+        operations_contrails_gain = np.zeros((1, emissions.shape[2])),
+        fuel_effect_correction_contrails = np.asarray(fuel_effect_correction_contrails, dtype=float),
     )
 
-    return climate_calc.df_climate
-
-#%% function to turn a list of dictionaries (as created by quantifying a number of activities) into a single dataframe of years and impact categories
-def total_LCIA(list_of_dic):
-    # prime an array with the right dimensions, matching number of impact categories and number of years
-    row_num = len(list_of_dic[0].keys())
-    col_num = len(list_of_dic[0][list(list_of_dic[0].keys())[0]].columns)
-    LCIA_array = np.zeros([row_num, col_num])
-    
-    # cycle through list of dictionaries
-    for i in range(len(list_of_dic)):
-        # cycle through each dictionary
-        loc = 0
-        for key, df in list_of_dic[i].items():
-            LCIA_array[loc] = LCIA_array[loc] + np.array(df.apply(np.sum, axis=0))
-            loc = loc + 1
-    
-    LCIA_df = pd.DataFrame(LCIA_array, columns = list_of_dic[0][list(list_of_dic[0].keys())[0]].columns)
-    
-    return LCIA_df
-
-#%% function to turn a list of dictionaries (as created by quantifying a number of activities) into a single dictionary
-def list_of_dic_to_dic(list_of_dic):
-    # prime an array with the right dimensions, matching number of impact categories and number of years
-    row_num = len(list_of_dic[0][list(list_of_dic[0].keys())[0]].index)
-    col_num = len(list_of_dic[0][list(list_of_dic[0].keys())[0]].columns)
-    LCIA_array = np.zeros([row_num, col_num])
-    
-    # cycle through list of dictionaries
-    for i in range(len(list_of_dic)):
-        # cycle through each dictionary
-        loc = 0
-        for key, df in list_of_dic[i].items():
-            LCIA_array[loc] = LCIA_array[loc] + np.array(df.apply(np.sum, axis=0))
-            loc = loc + 1
-    
+#%% function to turn a (year, impact category) array of LCIA results into a dictionary with a single-row dataframe per year
+def LCIA_total_to_dic(LCIA_total, y_start, impact_categories):
     LCIA_dic = {}
-    loc = 0
-    for key, df in list_of_dic[0].items():
-        key_here = key.split(",")[-1].strip()
-        LCIA_dic[key_here] = pd.DataFrame([LCIA_array[loc]], columns = list_of_dic[0][list(list_of_dic[0].keys())[0]].columns)
-        loc = loc + 1
+    for i in range(len(LCIA_total)):
+        LCIA_dic[str(y_start + i)] = pd.DataFrame([LCIA_total[i]], columns = impact_categories)
     
     return LCIA_dic
 
 #%% similar function to aaf_share_list, but more simple: calculates consumption of process based on linear change across a number of years
 def consumption_list(performance_milestones, y_start, y_stop, performance_0):
-    year_next = y_start
-    consumption_now = performance_0 # the share in the year previous to "year_next"
-    consumption_list = []
-    for index, row in performance_milestones.iterrows():
-        goal_year = row.loc['year']
-        goal_consumption = row.iloc[1] # use iloc to account for changing index based on application
-        while year_next <= goal_year:
-            consumption_next = consumption_now + (goal_consumption - consumption_now)/(goal_year - year_next + 1)
-            consumption_list.append(consumption_next)
-            consumption_now = consumption_next
-            year_next += 1
-    # in the case that the end year reaches beyond the timeline of goals, repeat the final goal to match length
-    while year_next <= y_stop:
-        consumption_list.append(consumption_next)
-        year_next += 1
-    # in the case that the end year is reached before the timeline of goals, shorten the timeline list
-    if year_next > y_stop: consumption_list = consumption_list[:y_stop - y_start + 1]
-    
-    return np.array(consumption_list)
+    # use iloc to account for changing column name of the consumption, based on application
+    return milestone_timeline(performance_milestones.loc[:, 'year'], performance_milestones.iloc[:, 1], performance_0, y_start, y_stop)
 
-#%% function to use a fleet to quantify a generic variable (comparable to use_fleet function for aircraft) IMPORTANT: make sure units are aligned in the plant_char variable!
-def generic_fleet_use(plant_char, consumption_index, production_index, fleet, total_demand = []):
-    consumption = plant_char.loc[consumption_index]
-    production = plant_char.loc[production_index]
-    
-    consumption_timeline = [] # timeline list where each entry shows how much is used
-    for i in fleet.index:
-        if list(total_demand) == []: # i.e., no total_demand is given -- we do not care about the demand, only about the capacity
-            production_here = fleet.loc[i]*production # quantity produced in total, divided over plant fleet
-            consumption_here = production_here*consumption # quantity required for production
-            consumption_timeline.append(consumption_here)
-        else:
-            capacity_here = fleet.loc[i]*production
-            demand_here = total_demand[i]
-            capacity_adjustment = demand_here/capacity_here.sum()
-            consumption_here = capacity_here*consumption*capacity_adjustment
-            consumption_timeline.append(consumption_here)
-    
-    consumption_timeline = pd.DataFrame(consumption_timeline)
-    consumption_timeline.index = fleet.index
+#%% function to use a fleet to quantify a set of generic variables at once, returned as an (attribute, year, cohort) array IMPORTANT: make sure units are aligned in the plant_char variable!
+def generic_fleet_use_matrix(plant_char, consumption_indexes, production_index, fleet, total_demand = []):
+    plant_char = plant_char.loc[:, fleet.columns]
+    consumption = plant_char.loc[list(consumption_indexes)].to_numpy(dtype = float) # (attribute, cohort)
+    production = plant_char.loc[production_index].to_numpy(dtype = float)
+    
+    capacity = fleet.to_numpy(dtype = float)*production # quantity produced in total, divided over plant fleet (year, cohort)
+    consumption_timeline = capacity[None, :, :]*consumption[:, None, :] # quantity required for production
+    if len(total_demand) != 0: # scale the capacity of each year to the demand of that year
+        demand = np.array([total_demand[i] for i in fleet.index], dtype = float)
+        capacity_adjustment = demand/row_sums(capacity)
+        consumption_timeline = consumption_timeline*capacity_adjustment[None, :, None]
     
     return consumption_timeline
 
-#%% function to more easily calculate a large amount of LCIA results based on timeline dataframes and to combine them into one dataframe
+#%% function to use a fleet to quantify a generic variable (comparable to use_fleet function for aircraft) IMPORTANT: make sure units are aligned in the plant_char variable!
+def generic_fleet_use(plant_char, consumption_index, production_index, fleet, total_demand = []):
+    return generic_fleet_timelines(plant_char, [consumption_index], production_index, fleet, total_demand)[0]
+
+#%% same as generic_fleet_use, but for several variables of the same fleet at once (returned as a list of timeline dataframes)
+def generic_fleet_timelines(plant_char, consumption_indexes, production_index, fleet, total_demand = []):
+    consumption_timelines = generic_fleet_use_matrix(plant_char, consumption_indexes, production_index, fleet, total_demand)
+    return [pd.DataFrame(timeline, index = fleet.index, columns = fleet.columns) for timeline in consumption_timelines]
+
+#%% function to more easily calculate a large amount of LCIA results based on timeline dataframes (each summed into a (year, impact category) array)
 def calculate_LCIAs_from_list(flow_list, label_list, dataframes_yearly, y_start):
-    flow_results = [] # start of a list of dictionaries for each flow
+    flow_results = [] # start of a list of arrays for each flow
     for i in range(len(flow_list)):
-        flow_results.append(allocate_LCIA(y_start, label_list[i], flow_list[i], dataframes_yearly))
+        flow_results.append(allocate_LCIA_total(y_start, label_list[i], flow_list[i], dataframes_yearly))
     
     return flow_results
 
-#%% establish characteristics of fuel plants and use them based on fuel demand
-def define_and_use_fuel_plants(y_start, y_end, y_plants_start, y_plants_end, plants, hydrogen_method, total_hydrogen, total_saf, PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped, plant_dataframes_yearly, process_dataframes_yearly):
-    # variable used for utility
-    h2_energy_density = 120 # MJ/kg
-    
+#%% plant chains that produce each fuel (e-fuel and liquid hydrogen), per hydrogen_method
+h2_energy_density = 120 # MJ/kg
+h2_loss = 0.01/h2_energy_density # hydrogen escaped to air per MJ of H2 consumed by a plant (1% loss) [kg/MJ]
+plant_chain_fuels = ['E-fuel', 'Liquid hydrogen fuel']
+plant_fleet_rows = ['EIS', 'max age', 'yearly production'] # rows of a plant_char used to build the fleet itself, rather than flows
+plant_technologies = {'PEM': 'Water electrolysis', 'DAC': 'Direct air capture', 'LIQ': 'Hydrogen liquefaction', 'FT': 'Fischer-Tropsch process'}
+
+# nodes: fleet name -> (plant type, fuel, demand), where the demand is None if the fleet produces the fuel itself, or (upstream fleet, attribute) if it supplies an upstream fleet
+# flows: (fuel, 'infra' or 'ops', fleet, attribute or 'inflow'/'outflow', factor, LCIA label, 'plant' or 'process' LCIA data), in the order in which LCIA results are listed
+plant_chains = {
+    # hydrogen production itself does not get a fleet, but is taken from the 'Hydrogen' process
+    'process': {
+        'nodes': {
+            'LIQ_H2': ('LIQ', 'Liquid hydrogen fuel', None),
+            'FT': ('FT', 'E-fuel', None),
+            'DAC_FT': ('DAC', 'E-fuel', ('FT', 'CO2 consumption')),
+            },
+        'flows': [
+            ('E-fuel', 'infra', 'FT', 'inflow', 1, 'FT plant construction', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'inflow', 1, 'DAC system construction', 'plant'),
+            ('E-fuel', 'infra', 'FT', 'outflow', 1, 'FT plant end-of-life', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'outflow', 1, 'DAC system end-of-life', 'plant'),
+            ('E-fuel', 'infra', 'FT', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'electricity consumption', 1, 'Electricity, medium voltage', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'electricity: total', 1, 'Electricity, medium voltage', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'sorbent consumption', 1, 'Sorbent', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'H2 consumption', h2_loss, 'Environmental flow, hydrogen to air', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'CO2 emissions', 1, 'Environmental flow, carbon dioxide to air', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'CO2 uptake', 1, 'Environmental flow, carbon dioxide to air', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'H2 consumption', 1 + h2_loss, 'Hydrogen', 'process'),
+            ('Liquid hydrogen fuel', 'infra', 'LIQ_H2', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'electricity consumption', 1, 'Electricity, medium voltage', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'hydrogen escaped to air', 1, 'Environmental flow, hydrogen to air', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'H2 consumption', h2_loss, 'Environmental flow, hydrogen to air', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'H2 consumption', 1 + h2_loss, 'Hydrogen', 'process'),
+            ],
+        'electricity': False, # electricity of hydrogen production is part of the 'Hydrogen' process, so electricity demands are incomplete and not reported
+        },
+    # fleets are constructed for PEM plants as well
+    'fleet': {
+        'nodes': {
+            'LIQ_H2': ('LIQ', 'Liquid hydrogen fuel', None),
+            'PEM_H2': ('PEM', 'Liquid hydrogen fuel', ('LIQ_H2', 'H2 consumption')),
+            'FT': ('FT', 'E-fuel', None),
+            'PEM_FT': ('PEM', 'E-fuel', ('FT', 'H2 consumption')),
+            'DAC_FT': ('DAC', 'E-fuel', ('FT', 'CO2 consumption')),
+            },
+        'flows': [
+            ('E-fuel', 'infra', 'FT', 'inflow', 1, 'FT plant construction', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'inflow', 1, 'DAC system construction', 'plant'),
+            ('E-fuel', 'infra', 'PEM_FT', 'inflow', 1, 'PEM electrolyzer construction', 'plant'),
+            ('E-fuel', 'infra', 'FT', 'outflow', 1, 'FT plant end-of-life', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'outflow', 1, 'DAC system end-of-life', 'plant'),
+            ('E-fuel', 'infra', 'PEM_FT', 'outflow', 1, 'PEM electrolyzer end-of-life', 'plant'),
+            ('E-fuel', 'infra', 'FT', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('E-fuel', 'infra', 'DAC_FT', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('E-fuel', 'infra', 'PEM_FT', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'electricity consumption', 1, 'Electricity, medium voltage', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'electricity: total', 1, 'Electricity, medium voltage', 'plant'),
+            ('E-fuel', 'ops', 'PEM_FT', 'electricity: total', 1, 'Electricity, medium voltage', 'plant'),
+            ('E-fuel', 'ops', 'PEM_FT', 'water consumption', 1, 'Water, deionised', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'sorbent consumption', 1, 'Sorbent', 'plant'),
+            ('E-fuel', 'ops', 'PEM_FT', 'hydrogen escaped to air', 1, 'Environmental flow, hydrogen to air', 'plant'),
+            ('E-fuel', 'ops', 'FT', 'CO2 emissions', 1, 'Environmental flow, carbon dioxide to air', 'plant'),
+            ('E-fuel', 'ops', 'DAC_FT', 'CO2 uptake', 1, 'Environmental flow, carbon dioxide to air', 'plant'),
+            ('Liquid hydrogen fuel', 'infra', 'PEM_H2', 'inflow', 1, 'PEM electrolyzer construction', 'plant'),
+            ('Liquid hydrogen fuel', 'infra', 'PEM_H2', 'outflow', 1, 'PEM electrolyzer end-of-life', 'plant'),
+            ('Liquid hydrogen fuel', 'infra', 'PEM_H2', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('Liquid hydrogen fuel', 'infra', 'LIQ_H2', 'occupation', 1, 'Environmental flow, land occupation', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'PEM_H2', 'electricity: total', 1, 'Electricity, medium voltage', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'electricity consumption', 1, 'Electricity, medium voltage', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'PEM_H2', 'water consumption', 1, 'Water, deionised', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'PEM_H2', 'hydrogen escaped to air', 1, 'Environmental flow, hydrogen to air', 'plant'),
+            ('Liquid hydrogen fuel', 'ops', 'LIQ_H2', 'hydrogen escaped to air', 1, 'Environmental flow, hydrogen to air', 'plant'),
+            ],
+        'electricity': True,
+        },
+    }
+
+#%% order the fleets of a plant chain so that each fleet comes after the fleet it supplies
+def plant_chain_order(nodes):
+    order = []
+    while len(order) < len(nodes):
+        ready = [name for name, (plant, fuel, demand) in nodes.items() if name not in order and (demand is None or demand[0] in order)]
+        if ready == []: raise ValueError('plant chain contains a loop or an unknown fleet: ' + ', '.join(name for name in nodes if name not in order))
+        order += ready
+    return order
+
+#%% build and use all fleets of a plant chain: returns a dictionary per fleet with its fleet, inflow and outflow, and a timeline dataframe per attribute
+def solve_plant_chain(nodes, plant_chars, plant_ages, fuel_demands, y_start, y_end):
+    fleets = {}
+    for name in plant_chain_order(nodes):
+        plant, fuel, demand = nodes[name]
+        if demand is None: total_demand = fuel_demands[fuel]
+        else: total_demand = fleets[demand[0]][demand[1]].sum(axis = 1) # demand of the fleet this fleet supplies
+        
+        plant_char = plant_chars[plant]
+        ages_0, max_age = plant_ages[plant]
+        fleet, inflow, outflow = fuel_fleet_builder(plant_char, ages_0, max_age, total_demand, y_start, y_end, 'yearly production')
+        attributes = [attribute for attribute in plant_char.index if attribute not in plant_fleet_rows]
+        fleets[name] = dict(zip(attributes, generic_fleet_timelines(plant_char, attributes, 'yearly production', fleet, total_demand))) # all attributes in one matrix operation
+        fleets[name].update({'fleet': fleet, 'inflow': inflow, 'outflow': outflow})
+    return fleets
+
+#%% establish characteristics of fuel plants: returns a table per plant type (read-only, as tables are shared between scenarios) and the ages at start of analysis and max age per plant type
+def define_plant_chars(y_plants_start, y_plants_end, plants, PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped):
     # establish characteristics of PEM plant
     PEM_plant_attributes = ['EIS', 'max age', 'occupation', 'electricity: electrolysis', 'water consumption', 'electricity: total', 'hydrogen escaped to air', 'yearly production']
     PEM_EIS = list(range(y_plants_start, y_plants_end + 1)) # entry into service of each plant [year]
@@ -765,216 +822,67 @@ def define_and_use_fuel_plants(y_start, y_end, y_plants_start, y_plants_end, pla
                     LIQ_prod_net],
                     index = LIQ_plant_attributes, columns = plants)
     
-    # if hydrogen_method == process, hydrogen production itself does not get a fleet
-    if hydrogen_method == 'process':
-        LIQ_fleet_H2, LIQ_inflow_H2, LIQ_outflow_H2 = fuel_fleet_builder(LIQ_plant_char, LIQ_ages_0, LIQ_max_age, total_hydrogen, y_start, y_end, 'yearly production')
-        LIQ_H2_demand_timeline = generic_fleet_use(LIQ_plant_char, 'H2 consumption', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in total MJ
-        
-        FT_fleet, FT_inflow, FT_outflow = fuel_fleet_builder(FT_plant_char, FT_ages_0, FT_max_age, total_saf, y_start, y_end, 'yearly production')
-        FT_CO2_demand_timeline = generic_fleet_use(FT_plant_char, 'CO2 consumption', 'yearly production', FT_fleet, total_saf) # in total kg
-        FT_H2_demand_timeline = generic_fleet_use(FT_plant_char, 'H2 consumption', 'yearly production', FT_fleet, total_saf) # in total MJ
-        total_FT_CO2 = FT_CO2_demand_timeline.sum(axis = 1)
-        
-        DAC_fleet_FT, DAC_inflow_FT, DAC_outflow_FT = fuel_fleet_builder(DAC_plant_char, DAC_ages_0, DAC_max_age, total_FT_CO2, y_start, y_end, 'yearly production')
-        
-        # and subsequenty, create total timeline dataframes for all input/output flows
-        LIQ_H2_occupation_timeline = generic_fleet_use(LIQ_plant_char, 'occupation', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        LIQ_H2_elec_demand_timeline = generic_fleet_use(LIQ_plant_char, 'electricity consumption', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        LIQ_H2_h2_emissions_timeline = generic_fleet_use(LIQ_plant_char, 'hydrogen escaped to air', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        
-        FT_occupation_timeline = generic_fleet_use(FT_plant_char, 'occupation', 'yearly production', FT_fleet, total_saf) # in m2
-        FT_elec_demand_timeline = generic_fleet_use(FT_plant_char, 'electricity consumption', 'yearly production', FT_fleet, total_saf) # in kWh
-        FT_co2_emissions_timeline = generic_fleet_use(FT_plant_char, 'CO2 emissions', 'yearly production', FT_fleet, total_saf) # in kg
-        DAC_FT_occupation_timeline = generic_fleet_use(DAC_plant_char, 'occupation', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in m2
-        DAC_FT_sorbent_demand_timeline = generic_fleet_use(DAC_plant_char, 'sorbent consumption', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kg
-        DAC_FT_elec_demand_timeline = generic_fleet_use(DAC_plant_char, 'electricity: total', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kWh
-        DAC_FT_co2_uptake_timeline = generic_fleet_use(DAC_plant_char, 'CO2 uptake', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kg
-        
-        # determine flows for production of H2 fuel
-        h2_occupations = [LIQ_H2_occupation_timeline]
-        h2_occupation_flows = ['Environmental flow, land occupation']*len(h2_occupations)
-        h2_elec_demands = [LIQ_H2_elec_demand_timeline]
-        h2_elec_flows = ['Electricity, medium voltage']*len(h2_elec_demands)
-        h2_h2_emissions = [LIQ_H2_h2_emissions_timeline, LIQ_H2_demand_timeline*0.01/h2_energy_density]
-        h2_h2_flows = ['Environmental flow, hydrogen to air']*len(h2_h2_emissions)
-        h2_process_emissions = [LIQ_H2_demand_timeline*(1 + 0.01/h2_energy_density)]
-        h2_process_flows = ['Hydrogen']*len(h2_process_emissions)
-        
-        # determine flows for production of e-fuel
-        saf_inflows = [FT_inflow, DAC_inflow_FT]
-        saf_inflow_flows = ['FT plant construction', 'DAC system construction']
-        saf_outflows = [FT_outflow, DAC_outflow_FT]
-        saf_outflow_flows = ['FT plant end-of-life', 'DAC system end-of-life']
-        saf_occupations = [FT_occupation_timeline, DAC_FT_occupation_timeline]
-        saf_occupation_flows = ['Environmental flow, land occupation']*len(saf_occupations)
-        saf_elec_demands = [FT_elec_demand_timeline, DAC_FT_elec_demand_timeline]
-        saf_elec_flows = ['Electricity, medium voltage']*len(saf_elec_demands)
-        saf_sorbent_demand = [DAC_FT_sorbent_demand_timeline]
-        saf_sorbent_flows = ['Sorbent']*len(saf_sorbent_demand)
-        saf_h2_emissions = [FT_H2_demand_timeline*0.01/h2_energy_density]
-        saf_h2_flows = ['Environmental flow, hydrogen to air']*len(saf_h2_emissions)
-        saf_co2_emissions_net = [FT_co2_emissions_timeline, DAC_FT_co2_uptake_timeline]
-        saf_co2_flows = ['Environmental flow, carbon dioxide to air']*len(saf_co2_emissions_net)
-        saf_process_emissions = [FT_H2_demand_timeline*(1 + 0.01/h2_energy_density)]
-        saf_process_flows = ['Hydrogen']*len(saf_process_emissions)
-        
-        # determine LCIAs for production of H2 fuel
-        h2_occupation_LCIAs = calculate_LCIAs_from_list(h2_occupations, h2_occupation_flows, plant_dataframes_yearly, y_start)
-        h2_elec_LCIAs = calculate_LCIAs_from_list(h2_elec_demands, h2_elec_flows, plant_dataframes_yearly, y_start)
-        h2_h2_LCIAs = calculate_LCIAs_from_list(h2_h2_emissions, h2_h2_flows, plant_dataframes_yearly, y_start)
-        h2_process_LCIAs = calculate_LCIAs_from_list(h2_process_emissions, h2_process_flows, process_dataframes_yearly, y_start)
-        
-        # determine LCIAs for production of e-fuel
-        saf_inflows_LCIAs = calculate_LCIAs_from_list(saf_inflows, saf_inflow_flows, plant_dataframes_yearly, y_start)
-        saf_outflows_LCIAs = calculate_LCIAs_from_list(saf_outflows, saf_outflow_flows, plant_dataframes_yearly, y_start)
-        saf_occupation_LCIAs = calculate_LCIAs_from_list(saf_occupations, saf_occupation_flows, plant_dataframes_yearly, y_start)
-        saf_elec_LCIAs = calculate_LCIAs_from_list(saf_elec_demands, saf_elec_flows, plant_dataframes_yearly, y_start)
-        saf_sorbent_LCIAs = calculate_LCIAs_from_list(saf_sorbent_demand, saf_sorbent_flows, plant_dataframes_yearly, y_start)
-        saf_h2_LCIAs = calculate_LCIAs_from_list(saf_h2_emissions, saf_h2_flows, plant_dataframes_yearly, y_start)
-        saf_co2_LCIAs = calculate_LCIAs_from_list(saf_co2_emissions_net, saf_co2_flows, plant_dataframes_yearly, y_start)
-        saf_process_LCIAs = calculate_LCIAs_from_list(saf_process_emissions, saf_process_flows, process_dataframes_yearly, y_start)
-        
-        # combine LCIAs (can be expanded based on graphing needs)
-        LCIA_saf_wtt = saf_inflows_LCIAs + saf_outflows_LCIAs + saf_occupation_LCIAs + saf_elec_LCIAs + saf_sorbent_LCIAs + saf_h2_LCIAs + saf_co2_LCIAs + saf_process_LCIAs
-        LCIA_h2_wtt = h2_occupation_LCIAs + h2_elec_LCIAs + h2_h2_LCIAs + h2_process_LCIAs
-        
-        LCIA_saf_wtt_infra = saf_inflows_LCIAs + saf_outflows_LCIAs + saf_occupation_LCIAs
-        LCIA_saf_wtt_ops = saf_elec_LCIAs + saf_sorbent_LCIAs + saf_h2_LCIAs + saf_co2_LCIAs + saf_process_LCIAs
-        LCIA_h2_wtt_infra = h2_occupation_LCIAs
-        LCIA_h2_wtt_ops = h2_elec_LCIAs + h2_h2_LCIAs + h2_process_LCIAs
-        
-        # create these variables to align with how this function is structured -- however, they cannot be used
+    plant_chars = {'PEM': PEM_plant_char, 'DAC': DAC_plant_char, 'FT': FT_plant_char, 'LIQ': LIQ_plant_char}
+    for plant, plant_char in plant_chars.items():
+        values = plant_char.to_numpy(dtype = float)
+        values.flags.writeable = False
+        plant_chars[plant] = pd.DataFrame(values, index = plant_char.index, columns = plant_char.columns, copy = False)
+    plant_ages = {'PEM': (tuple(PEM_ages_0), PEM_max_age), 'DAC': (tuple(DAC_ages_0), DAC_max_age), 'FT': (tuple(FT_ages_0), FT_max_age), 'LIQ': (tuple(LIQ_ages_0), LIQ_max_age)}
+    
+    return plant_chars, plant_ages
+
+#%% use fuel plants based on fuel demand, with plant characteristics as given by define_plant_chars
+def define_and_use_fuel_plants(y_start, y_end, plant_chars, plant_ages, hydrogen_method, total_hydrogen, total_saf, plant_dataframes_yearly, process_dataframes_yearly):
+    # build and use the fleets of the plant chain of this hydrogen_method
+    chain = plant_chains[hydrogen_method]
+    fuel_demands = {'E-fuel': total_saf, 'Liquid hydrogen fuel': total_hydrogen}
+    fleets = solve_plant_chain(chain['nodes'], plant_chars, plant_ages, fuel_demands, y_start, y_end)
+    dataframes_yearly = {'plant': plant_dataframes_yearly, 'process': process_dataframes_yearly}
+    
+    # determine LCIAs of all flows, per fuel and part of the life cycle (infrastructure or operations)
+    LCIAs = {(fuel, stage): [] for fuel in plant_chain_fuels for stage in ['infra', 'ops']}
+    electricity_by_technology = {technology: [] for technology in plant_technologies.values()}
+    electricity_per_fuel = {fuel: [] for fuel in plant_chain_fuels}
+    for fuel, stage, name, attribute, factor, label, data in chain['flows']:
+        timeline = fleets[name][attribute]
+        if factor != 1: timeline = timeline*factor
+        LCIAs[fuel, stage] += calculate_LCIAs_from_list([timeline], [label], dataframes_yearly[data], y_start)
+        if label == 'Electricity, medium voltage':
+            electricity_by_technology[plant_technologies[chain['nodes'][name][0]]].append(timeline.sum(axis = 1))
+            electricity_per_fuel[fuel].append(timeline.sum(axis = 1))
+    
+    # combine LCIAs (can be expanded based on graphing needs)
+    LCIA_saf_wtt_infra = LCIAs['E-fuel', 'infra']
+    LCIA_saf_wtt_ops = LCIAs['E-fuel', 'ops']
+    LCIA_h2_wtt_infra = LCIAs['Liquid hydrogen fuel', 'infra']
+    LCIA_h2_wtt_ops = LCIAs['Liquid hydrogen fuel', 'ops']
+    LCIA_saf_wtt = LCIA_saf_wtt_infra + LCIA_saf_wtt_ops
+    LCIA_h2_wtt = LCIA_h2_wtt_infra + LCIA_h2_wtt_ops
+    
+    # electricity demands, with a zero timeline for technologies and fuels without electricity flows (otherwise, create these variables to align with how this function is structured -- however, they cannot be used)
+    n_years = len(total_saf)
+    if chain['electricity']:
+        electricity_demands = pd.DataFrame(np.array([sum(electricity, np.zeros(n_years)) for electricity in electricity_by_technology.values()]).T, columns = list(electricity_by_technology.keys()), index = np.arange(n_years))
+        electricity_by_fuel = pd.DataFrame(np.array([sum(electricity_per_fuel[fuel], np.zeros(n_years)) for fuel in plant_chain_fuels]).T, columns = plant_chain_fuels, index = np.arange(n_years))
+    else:
         electricity_demands = 0
         electricity_by_fuel = 0
-        
-        # hydrogen demands
-        total_LIQ_H2 = LIQ_H2_demand_timeline.sum(axis = 1)
-        total_FT_H2 = FT_H2_demand_timeline.sum(axis = 1)
-        hydrogen_demands = pd.DataFrame(np.array([total_FT_H2*(1 + 0.01), total_LIQ_H2*(1 + 0.01)]).T, columns = ['E-fuel', 'Liquid hydrogen fuel'], index = np.arange(len(total_LIQ_H2)))
-       
-    # if hydrogen_method == fleet, fleets are constructed for PEM plants as well
-    if hydrogen_method == 'fleet':
-        LIQ_fleet_H2, LIQ_inflow_H2, LIQ_outflow_H2 = fuel_fleet_builder(LIQ_plant_char, LIQ_ages_0, LIQ_max_age, total_hydrogen, y_start, y_end, 'yearly production')
-        LIQ_H2_demand_timeline = generic_fleet_use(LIQ_plant_char, 'H2 consumption', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in total MJ
-        total_LIQ_H2 = LIQ_H2_demand_timeline.sum(axis = 1)
-        
-        PEM_fleet_H2, PEM_inflow_H2, PEM_outflow_H2 = fuel_fleet_builder(PEM_plant_char, PEM_ages_0, PEM_max_age, total_LIQ_H2, y_start, y_end, 'yearly production')
-        
-        FT_fleet, FT_inflow, FT_outflow = fuel_fleet_builder(FT_plant_char, FT_ages_0, FT_max_age, total_saf, y_start, y_end, 'yearly production')
-        FT_CO2_demand_timeline = generic_fleet_use(FT_plant_char, 'CO2 consumption', 'yearly production', FT_fleet, total_saf) # in total kg
-        FT_H2_demand_timeline = generic_fleet_use(FT_plant_char, 'H2 consumption', 'yearly production', FT_fleet, total_saf) # in total MJ
-        total_FT_H2 = FT_H2_demand_timeline.sum(axis = 1)
-        total_FT_CO2 = FT_CO2_demand_timeline.sum(axis = 1)
-        
-        PEM_fleet_FT, PEM_inflow_FT, PEM_outflow_FT = fuel_fleet_builder(PEM_plant_char, PEM_ages_0, PEM_max_age, total_FT_H2, y_start, y_end, 'yearly production')
-        DAC_fleet_FT, DAC_inflow_FT, DAC_outflow_FT = fuel_fleet_builder(DAC_plant_char, DAC_ages_0, DAC_max_age, total_FT_CO2, y_start, y_end, 'yearly production')
-        
-        # and subsequenty, create total timeline dataframes for all input/output flows
-        LIQ_H2_occupation_timeline = generic_fleet_use(LIQ_plant_char, 'occupation', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        LIQ_H2_elec_demand_timeline = generic_fleet_use(LIQ_plant_char, 'electricity consumption', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        LIQ_H2_h2_emissions_timeline = generic_fleet_use(LIQ_plant_char, 'hydrogen escaped to air', 'yearly production', LIQ_fleet_H2, total_hydrogen) # in m2
-        PEM_H2_occupation_timeline = generic_fleet_use(PEM_plant_char, 'occupation', 'yearly production', PEM_fleet_H2, total_LIQ_H2) # in m2
-        PEM_H2_water_demand_timeline = generic_fleet_use(PEM_plant_char, 'water consumption', 'yearly production', PEM_fleet_H2, total_LIQ_H2) # in m2
-        PEM_H2_elec_demand_timeline = generic_fleet_use(PEM_plant_char, 'electricity: total', 'yearly production', PEM_fleet_H2, total_LIQ_H2) # in m2
-        PEM_H2_h2_emissions_timeline = generic_fleet_use(PEM_plant_char, 'hydrogen escaped to air', 'yearly production', PEM_fleet_H2, total_LIQ_H2) # in m2
-        
-        FT_occupation_timeline = generic_fleet_use(FT_plant_char, 'occupation', 'yearly production', FT_fleet, total_saf) # in m2
-        FT_elec_demand_timeline = generic_fleet_use(FT_plant_char, 'electricity consumption', 'yearly production', FT_fleet, total_saf) # in kWh
-        FT_co2_emissions_timeline = generic_fleet_use(FT_plant_char, 'CO2 emissions', 'yearly production', FT_fleet, total_saf) # in kg
-        PEM_FT_occupation_timeline = generic_fleet_use(PEM_plant_char, 'occupation', 'yearly production', PEM_fleet_FT, total_FT_H2) # in m2
-        PEM_FT_water_demand_timeline = generic_fleet_use(PEM_plant_char, 'water consumption', 'yearly production', PEM_fleet_FT, total_FT_H2) # in m2
-        PEM_FT_elec_demand_timeline = generic_fleet_use(PEM_plant_char, 'electricity: total', 'yearly production', PEM_fleet_FT, total_FT_H2) # in m2
-        PEM_FT_h2_emissions_timeline = generic_fleet_use(PEM_plant_char, 'hydrogen escaped to air', 'yearly production', PEM_fleet_FT, total_FT_H2) # in m2
-        DAC_FT_occupation_timeline = generic_fleet_use(DAC_plant_char, 'occupation', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in m2
-        DAC_FT_sorbent_demand_timeline = generic_fleet_use(DAC_plant_char, 'sorbent consumption', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kg
-        DAC_FT_elec_demand_timeline = generic_fleet_use(DAC_plant_char, 'electricity: total', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kWh
-        DAC_FT_co2_uptake_timeline = generic_fleet_use(DAC_plant_char, 'CO2 uptake', 'yearly production', DAC_fleet_FT, total_FT_CO2) # in kg
-        
-        # determine flows for production of H2 fuel
-        h2_inflows = [PEM_inflow_H2]
-        h2_inflow_flows = ['PEM electrolyzer construction']
-        h2_outflows = [PEM_outflow_H2]
-        h2_outflow_flows = ['PEM electrolyzer end-of-life']
-        h2_occupations = [PEM_H2_occupation_timeline, LIQ_H2_occupation_timeline]
-        h2_occupation_flows = ['Environmental flow, land occupation']*len(h2_occupations)
-        h2_elec_demands = [PEM_H2_elec_demand_timeline, LIQ_H2_elec_demand_timeline]
-        h2_elec_flows = ['Electricity, medium voltage']*len(h2_elec_demands)
-        h2_water_demands = [PEM_H2_water_demand_timeline]
-        h2_water_flows = ['Water, deionised']*len(h2_water_demands)
-        h2_h2_emissions = [PEM_H2_h2_emissions_timeline, LIQ_H2_h2_emissions_timeline]
-        h2_h2_flows = ['Environmental flow, hydrogen to air']*len(h2_h2_emissions)
-        
-        # determine flows for production of e-fuel
-        saf_inflows = [FT_inflow, DAC_inflow_FT, PEM_inflow_FT]
-        saf_inflow_flows = ['FT plant construction', 'DAC system construction', 'PEM electrolyzer construction']
-        saf_outflows = [FT_outflow, DAC_outflow_FT, PEM_outflow_FT]
-        saf_outflow_flows = ['FT plant end-of-life', 'DAC system end-of-life', 'PEM electrolyzer end-of-life']
-        saf_occupations = [FT_occupation_timeline, DAC_FT_occupation_timeline, PEM_FT_occupation_timeline]
-        saf_occupation_flows = ['Environmental flow, land occupation']*len(saf_occupations)
-        saf_elec_demands = [FT_elec_demand_timeline, DAC_FT_elec_demand_timeline, PEM_FT_elec_demand_timeline]
-        saf_elec_flows = ['Electricity, medium voltage']*len(saf_elec_demands)
-        saf_water_demands = [PEM_FT_water_demand_timeline]
-        saf_water_flows = ['Water, deionised']*len(saf_water_demands)
-        saf_sorbent_demand = [DAC_FT_sorbent_demand_timeline]
-        saf_sorbent_flows = ['Sorbent']*len(saf_sorbent_demand)
-        saf_h2_emissions = [PEM_FT_h2_emissions_timeline]
-        saf_h2_flows = ['Environmental flow, hydrogen to air']*len(saf_h2_emissions)
-        saf_co2_emissions_net = [FT_co2_emissions_timeline, DAC_FT_co2_uptake_timeline]
-        saf_co2_flows = ['Environmental flow, carbon dioxide to air']*len(saf_co2_emissions_net)
-        
-        # determine LCIAs for production of H2 fuel
-        h2_inflows_LCIAs = calculate_LCIAs_from_list(h2_inflows, h2_inflow_flows, plant_dataframes_yearly, y_start)
-        h2_outflows_LCIAs = calculate_LCIAs_from_list(h2_outflows, h2_outflow_flows, plant_dataframes_yearly, y_start)
-        h2_occupation_LCIAs = calculate_LCIAs_from_list(h2_occupations, h2_occupation_flows, plant_dataframes_yearly, y_start)
-        h2_elec_LCIAs = calculate_LCIAs_from_list(h2_elec_demands, h2_elec_flows, plant_dataframes_yearly, y_start)
-        h2_water_LCIAs = calculate_LCIAs_from_list(h2_water_demands, h2_water_flows, plant_dataframes_yearly, y_start)
-        h2_h2_LCIAs = calculate_LCIAs_from_list(h2_h2_emissions, h2_h2_flows, plant_dataframes_yearly, y_start)
-        
-        # determine LCIAs for production of e-fuel
-        saf_inflows_LCIAs = calculate_LCIAs_from_list(saf_inflows, saf_inflow_flows, plant_dataframes_yearly, y_start)
-        saf_outflows_LCIAs = calculate_LCIAs_from_list(saf_outflows, saf_outflow_flows, plant_dataframes_yearly, y_start)
-        saf_occupation_LCIAs = calculate_LCIAs_from_list(saf_occupations, saf_occupation_flows, plant_dataframes_yearly, y_start)
-        saf_elec_LCIAs = calculate_LCIAs_from_list(saf_elec_demands, saf_elec_flows, plant_dataframes_yearly, y_start)
-        saf_water_LCIAs = calculate_LCIAs_from_list(saf_water_demands, saf_water_flows, plant_dataframes_yearly, y_start)
-        saf_sorbent_LCIAs = calculate_LCIAs_from_list(saf_sorbent_demand, saf_sorbent_flows, plant_dataframes_yearly, y_start)
-        saf_h2_LCIAs = calculate_LCIAs_from_list(saf_h2_emissions, saf_h2_flows, plant_dataframes_yearly, y_start)
-        saf_co2_LCIAs = calculate_LCIAs_from_list(saf_co2_emissions_net, saf_co2_flows, plant_dataframes_yearly, y_start)
-        
-        # combine LCIAs (can be expanded based on graphing needs)
-        LCIA_saf_wtt = saf_inflows_LCIAs + saf_outflows_LCIAs + saf_occupation_LCIAs + saf_elec_LCIAs + saf_water_LCIAs + saf_sorbent_LCIAs + saf_h2_LCIAs + saf_co2_LCIAs
-        LCIA_h2_wtt =  h2_inflows_LCIAs + h2_outflows_LCIAs + h2_occupation_LCIAs + h2_elec_LCIAs + h2_water_LCIAs + h2_h2_LCIAs
-        
-        LCIA_saf_wtt_infra = saf_inflows_LCIAs + saf_outflows_LCIAs + saf_occupation_LCIAs
-        LCIA_saf_wtt_ops = saf_elec_LCIAs + saf_water_LCIAs + saf_sorbent_LCIAs + saf_h2_LCIAs + saf_co2_LCIAs
-        LCIA_h2_wtt_infra = h2_inflows_LCIAs + h2_outflows_LCIAs + h2_occupation_LCIAs
-        LCIA_h2_wtt_ops = h2_elec_LCIAs + h2_water_LCIAs + h2_h2_LCIAs
-        
-        # electricity demands
-        electricity_h2_h2 = (PEM_H2_elec_demand_timeline).sum(axis = 1)
-        electricity_h2_ft = (PEM_FT_elec_demand_timeline).sum(axis = 1)
-        electricity_dac = (DAC_FT_elec_demand_timeline).sum(axis = 1)
-        electricity_liq = (LIQ_H2_elec_demand_timeline).sum(axis = 1)
-        electricity_ft = (FT_elec_demand_timeline).sum(axis = 1)
-        electricity_demands = pd.DataFrame(np.array([electricity_h2_h2 + electricity_h2_ft, electricity_dac, electricity_liq, electricity_ft]).T, columns = ['Water electrolysis', 'Direct air capture', 'Hydrogen liquefaction', 'Fischer-Tropsch process'], index = np.arange(len(electricity_ft)))
-        electricity_by_fuel = pd.DataFrame(np.array([electricity_h2_ft + electricity_dac + electricity_ft, electricity_h2_h2 + electricity_liq]).T, columns = ['E-fuel', 'Liquid hydrogen fuel'], index = np.arange(len(electricity_ft)))
-        
-        # hydrogen demands
-        hydrogen_demands = pd.DataFrame(np.array([total_FT_H2*(1 + 0.01), total_LIQ_H2*(1 + 0.01)]).T, columns = ['E-fuel', 'Liquid hydrogen fuel'], index = np.arange(len(total_LIQ_H2)))
-        
+    
+    # hydrogen demands (including 1% losses), fuel production capacity and capacity added -- the latter two of the fleets that produce the fuels themselves
+    # (start from zero timelines, so fuels without flows or fleets still get a timeline)
+    hydrogen = {fuel: np.zeros(n_years) for fuel in plant_chain_fuels}
+    capacities = {fuel: np.zeros(n_years) for fuel in plant_chain_fuels}
+    capacities_added = {fuel: np.zeros(n_years) for fuel in plant_chain_fuels}
+    for name, (plant, fuel, demand) in chain['nodes'].items():
+        if 'H2 consumption' in fleets[name]: hydrogen[fuel] = hydrogen[fuel] + fleets[name]['H2 consumption'].sum(axis = 1)
+        if demand is None:
+            capacities[fuel] = capacities[fuel] + (generic_fleet_use(plant_chars[plant], 'max age', 'yearly production', fleets[name]['fleet'])/plant_ages[plant][1]).sum(axis = 1) # in MJ
+            capacities_added[fuel] = capacities_added[fuel] + (generic_fleet_use(plant_chars[plant], 'max age', 'yearly production', fleets[name]['inflow'])/plant_ages[plant][1]).sum(axis = 1) # in MJ
+    hydrogen_demands = pd.DataFrame(np.array([hydrogen[fuel]*(1 + 0.01) for fuel in plant_chain_fuels]).T, columns = plant_chain_fuels, index = np.arange(n_years))
+    
     # create additional variables for export to plotting
-    # fuel production capacity
-    FT_capacity_timeline = generic_fleet_use(FT_plant_char, 'max age', 'yearly production', FT_fleet)/FT_max_age # in MJ
-    LH2_capacity_timeline = generic_fleet_use(LIQ_plant_char, 'max age', 'yearly production', LIQ_fleet_H2)/LIQ_max_age # in MJ
-    FT_capacity = (FT_capacity_timeline).sum(axis = 1)
-    LH2_capacity = (LH2_capacity_timeline).sum(axis = 1)
-    fuel_capacities = pd.DataFrame(np.array([FT_capacity, LH2_capacity]).T, columns = ['E-fuel', 'Liquid hydrogen fuel'], index = np.arange(len(FT_capacity)))
-    
-    # fuel production capacity added
-    FT_capacity_added_timeline = generic_fleet_use(FT_plant_char, 'max age', 'yearly production', FT_inflow)/FT_max_age # in MJ
-    LH2_capacity_added_timeline = generic_fleet_use(LIQ_plant_char, 'max age', 'yearly production', LIQ_inflow_H2)/LIQ_max_age # in MJ
-    FT_capacity_added = (FT_capacity_added_timeline).sum(axis = 1)
-    LH2_capacity_added = (LH2_capacity_added_timeline).sum(axis = 1)
-    fuel_capacities_added = pd.DataFrame(np.array([FT_capacity_added, LH2_capacity_added]).T, columns = ['E-fuel', 'Liquid hydrogen fuel'], index = np.arange(len(FT_capacity_added)))    
+    fuel_capacities = pd.DataFrame(np.array([capacities[fuel] for fuel in plant_chain_fuels]).T, columns = plant_chain_fuels, index = np.arange(n_years))
+    fuel_capacities_added = pd.DataFrame(np.array([capacities_added[fuel] for fuel in plant_chain_fuels]).T, columns = plant_chain_fuels, index = np.arange(n_years))
     
     return [LCIA_saf_wtt, LCIA_h2_wtt, LCIA_saf_wtt_infra, LCIA_saf_wtt_ops, LCIA_h2_wtt_infra, LCIA_h2_wtt_ops, electricity_demands, fuel_capacities, electricity_by_fuel, fuel_capacities_added, hydrogen_demands]
 
@@ -1000,7 +908,7 @@ def extract_processes(list_of_dic, impact_cat, i_list):
     return impacts_total
 
 #%% large function combining all previous functions to more easily execute a series of scenarios
-def single_type_scenario(flight_start_year, flight_end_year, aircraft_dataframes_yearly, aircraft_char, rpk_segments, max_age_0, ages_0, aaf_0, aaf_milestones, no_decreases, occupation, cirrus_rf_change_h2, plant_start_year, plant_end_year, plants, PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped, hydrogen_method, plant_dataframes_yearly, process_dataframes_yearly):
+def single_type_scenario(flight_start_year, flight_end_year, aircraft_dataframes_yearly, aircraft_char, rpk_segments, max_age_0, ages_0, aaf_0, aaf_milestones, no_decreases, occupation, cirrus_rf_change_h2, plant_chars, plant_ages, hydrogen_method, plant_dataframes_yearly, process_dataframes_yearly, contribution_analysis = False):
     # several functions are run for each of the destination pairs (scenarios connecting demand, flight distance, and hydrogen share)
     rpk = np.zeros(flight_end_year - flight_start_year + 1)
     fleet = pd.DataFrame(0, columns = aircraft_char.columns, index = np.arange(len(rpk)))
@@ -1050,66 +958,60 @@ def single_type_scenario(flight_start_year, flight_end_year, aircraft_dataframes
     hydrogen_by_aircraft = fuel_LTO_hydrogen + fuel_CCD_hydrogen 
     total_fuel_by_aircraft = fossil_by_aircraft.add(saf_by_aircraft, fill_value=0).add(hydrogen_by_aircraft, fill_value=0)
     
-    # build LCI(A) of aircraft system over time
-    LCIA_inflow = allocate_LCIA(flight_start_year, 'Aircraft manufacturing', inflow, aircraft_dataframes_yearly)
-    LCIA_outflow = allocate_LCIA(flight_start_year, 'Aircraft end-of-life', outflow, aircraft_dataframes_yearly)
+    # build LCI(A) of aircraft system over time, each as a (year, impact category) array summed over aircraft
+    # results per aircraft are only kept if they are needed for contribution analysis
+    contributions = {} if contribution_analysis else None
+    LCIA_inflow = allocate_LCIA_total(flight_start_year, 'Aircraft manufacturing', inflow, aircraft_dataframes_yearly, contributions)
+    LCIA_outflow = allocate_LCIA_total(flight_start_year, 'Aircraft end-of-life', outflow, aircraft_dataframes_yearly, contributions)
     
     # get LCIA results of fuel production systems
-    LCIAs_fuels_wtt = define_and_use_fuel_plants(flight_start_year, flight_end_year, plant_start_year, plant_end_year, plants, hydrogen_method, total_hydrogen, total_saf, PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped, plant_dataframes_yearly, process_dataframes_yearly)
+    LCIAs_fuels_wtt = define_and_use_fuel_plants(flight_start_year, flight_end_year, plant_chars, plant_ages, hydrogen_method, total_hydrogen, total_saf, plant_dataframes_yearly, process_dataframes_yearly)
     
     # use fuel quantities abtained above to multiply LCI(A)s
-    LCIA_fossil_wtt = allocate_LCIA(flight_start_year, 'Fossil kerosene', fuel_LTO_fossil + fuel_CCD_fossil, aircraft_dataframes_yearly)
-    LCIA_fossil_LTO_ttw = allocate_LCIA(flight_start_year, 'Fuel use, fossil kerosene, LTO', fuel_LTO_fossil, aircraft_dataframes_yearly)
-    LCIA_fossil_CCD_ttw = allocate_LCIA(flight_start_year, 'Fuel use, fossil kerosene, CCD', fuel_CCD_fossil, aircraft_dataframes_yearly)
+    LCIA_fossil_wtt = allocate_LCIA_total(flight_start_year, 'Fossil kerosene', fuel_LTO_fossil + fuel_CCD_fossil, aircraft_dataframes_yearly, contributions)
+    LCIA_fossil_LTO_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, fossil kerosene, LTO', fuel_LTO_fossil, aircraft_dataframes_yearly, contributions)
+    LCIA_fossil_CCD_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, fossil kerosene, CCD', fuel_CCD_fossil, aircraft_dataframes_yearly, contributions)
     
-    LCIA_saf_wtt = list_of_dic_to_dic(LCIAs_fuels_wtt[0])
-    LCIA_saf_LTO_ttw = allocate_LCIA(flight_start_year, 'Fuel use, syn-kerosene, LTO', fuel_LTO_saf, aircraft_dataframes_yearly)
-    LCIA_saf_CCD_ttw = allocate_LCIA(flight_start_year, 'Fuel use, syn-kerosene, CCD', fuel_CCD_saf, aircraft_dataframes_yearly)
+    LCIA_saf_wtt = sum(LCIAs_fuels_wtt[0])
+    LCIA_saf_LTO_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, syn-kerosene, LTO', fuel_LTO_saf, aircraft_dataframes_yearly, contributions)
+    LCIA_saf_CCD_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, syn-kerosene, CCD', fuel_CCD_saf, aircraft_dataframes_yearly, contributions)
     
-    LCIA_h2_wtt = list_of_dic_to_dic(LCIAs_fuels_wtt[1])
-    LCIA_h2_LTO_ttw = allocate_LCIA(flight_start_year, 'Fuel use, H2 turbine, LTO', fuel_LTO_hydrogen, aircraft_dataframes_yearly)
-    LCIA_h2_CCD_ttw = allocate_LCIA(flight_start_year, 'Fuel use, H2 turbine, CCD', fuel_CCD_hydrogen, aircraft_dataframes_yearly)
+    LCIA_h2_wtt = sum(LCIAs_fuels_wtt[1])
+    LCIA_h2_LTO_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, H2 turbine, LTO', fuel_LTO_hydrogen, aircraft_dataframes_yearly, contributions)
+    LCIA_h2_CCD_ttw = allocate_LCIA_total(flight_start_year, 'Fuel use, H2 turbine, CCD', fuel_CCD_hydrogen, aircraft_dataframes_yearly, contributions)
     
     # alterenative perspective on wtt
-    LCIA_saf_wtt_infra = list_of_dic_to_dic(LCIAs_fuels_wtt[2])
-    LCIA_saf_wtt_ops = list_of_dic_to_dic(LCIAs_fuels_wtt[3])
-    LCIA_h2_wtt_infra = list_of_dic_to_dic(LCIAs_fuels_wtt[4])
-    LCIA_h2_wtt_ops = list_of_dic_to_dic(LCIAs_fuels_wtt[5])
-    
-    # create a list of all the dictionaries created above
-    # list_of_dic = [LCIA_inflow, LCIA_outflow, LCIA_fossil_wtt, LCIA_fossil_LTO_ttw, LCIA_fossil_CCD_ttw, LCIA_saf_wtt, LCIA_saf_LTO_ttw, LCIA_saf_CCD_ttw, LCIA_h2_wtt, LCIA_h2_LTO_ttw, LCIA_h2_CCD_ttw]
-    list_of_dic = [LCIA_inflow, LCIA_outflow, LCIA_fossil_wtt, LCIA_fossil_LTO_ttw, LCIA_fossil_CCD_ttw, LCIA_saf_wtt_infra, LCIA_saf_wtt_ops, LCIA_saf_LTO_ttw, LCIA_saf_CCD_ttw, LCIA_h2_wtt_infra, LCIA_h2_wtt_ops, LCIA_h2_LTO_ttw, LCIA_h2_CCD_ttw]
-    
-    # turn list of dictionaries into single dataframe of impacts over time
-    LCIA_df = total_LCIA(list_of_dic)
-    
-    # calculate RF impact with LWE
-    lwe_input = pd.DataFrame()
-    lwe_input['years'] = list(range(flight_start_year, flight_end_year + 1))
-    
-    for impact_cat in aircraft_dataframes_yearly[list(aircraft_dataframes_yearly.keys())[0]].columns[16:28]: # these indexes are specific to the way the LCIA results are exported from the AB
-        lwe_inflow = impact_cat_result(LCIA_inflow, impact_cat)
-        lwe_outflow = impact_cat_result(LCIA_outflow, impact_cat)
-        lwe_fossil_wtt = impact_cat_result(LCIA_fossil_wtt, impact_cat)
-        lwe_saf_wtt = impact_cat_result(LCIA_saf_wtt, impact_cat)
-        lwe_h2_wtt = impact_cat_result(LCIA_h2_wtt, impact_cat)
-        lwe_total = lwe_inflow + lwe_outflow + lwe_fossil_wtt + lwe_saf_wtt + lwe_h2_wtt
-        lwe_input[impact_cat+' (ground)'] = lwe_total
-      
-    for impact_cat in aircraft_dataframes_yearly[list(aircraft_dataframes_yearly.keys())[0]].columns[27:]: # these indexes are specific to the way the LCIA results are exported from the AB
-        lwe_fossil_LTO_ttw = impact_cat_result(LCIA_fossil_LTO_ttw, impact_cat)
-        lwe_fossil_CCD_ttw = impact_cat_result(LCIA_fossil_CCD_ttw, impact_cat)
-        lwe_saf_LTO_ttw = impact_cat_result(LCIA_saf_LTO_ttw, impact_cat)
-        lwe_saf_CCD_ttw = impact_cat_result(LCIA_saf_CCD_ttw, impact_cat)
-        lwe_h2_LTO_ttw = impact_cat_result(LCIA_h2_LTO_ttw, impact_cat)
-        lwe_h2_CCD_ttw = impact_cat_result(LCIA_h2_CCD_ttw, impact_cat)
-        lwe_total = lwe_fossil_LTO_ttw + lwe_fossil_CCD_ttw + lwe_saf_LTO_ttw + lwe_saf_CCD_ttw + lwe_h2_LTO_ttw + lwe_h2_CCD_ttw
-        lwe_input[impact_cat+' (flight)'] = lwe_total
+    LCIA_saf_wtt_infra = sum(LCIAs_fuels_wtt[2])
+    LCIA_saf_wtt_ops = sum(LCIAs_fuels_wtt[3])
+    LCIA_h2_wtt_infra = sum(LCIAs_fuels_wtt[4])
+    LCIA_h2_wtt_ops = sum(LCIAs_fuels_wtt[5])
+    
+    # sum all of the above into a single dataframe of impacts over time
+    impact_categories = aircraft_dataframes_yearly.impact_categories
+    LCIA_total = np.zeros((len(rpk), len(impact_categories)))
+    for LCIA_here in [LCIA_inflow, LCIA_outflow, LCIA_fossil_wtt, LCIA_fossil_LTO_ttw, LCIA_fossil_CCD_ttw, LCIA_saf_wtt_infra, LCIA_saf_wtt_ops, LCIA_saf_LTO_ttw, LCIA_saf_CCD_ttw, LCIA_h2_wtt_infra, LCIA_h2_wtt_ops, LCIA_h2_LTO_ttw, LCIA_h2_CCD_ttw]:
+        LCIA_total = LCIA_total + LCIA_here
+    LCIA_df = pd.DataFrame(LCIA_total, columns = impact_categories)
+    
+    # for contribution analysis, create a list of dictionaries (per year) of all the LCIA results
+    list_of_dic = None
+    if contribution_analysis:
+        list_of_dic = [contributions['Aircraft manufacturing'], contributions['Aircraft end-of-life'], contributions['Fossil kerosene'], contributions['Fuel use, fossil kerosene, LTO'], contributions['Fuel use, fossil kerosene, CCD'],
+                       LCIA_total_to_dic(LCIA_saf_wtt_infra, flight_start_year, impact_categories), LCIA_total_to_dic(LCIA_saf_wtt_ops, flight_start_year, impact_categories), contributions['Fuel use, syn-kerosene, LTO'], contributions['Fuel use, syn-kerosene, CCD'],
+                       LCIA_total_to_dic(LCIA_h2_wtt_infra, flight_start_year, impact_categories), LCIA_total_to_dic(LCIA_h2_wtt_ops, flight_start_year, impact_categories), contributions['Fuel use, H2 turbine, LTO'], contributions['Fuel use, H2 turbine, CCD']]
+    
+    # calculate RF impact with LWE, taking the emissions of each substance from the ground and flight parts of the life cycle (see LWE_inventory)
+    LCIA_ground = LCIA_inflow + LCIA_outflow + LCIA_fossil_wtt + LCIA_saf_wtt + LCIA_h2_wtt
+    LCIA_flight = LCIA_fossil_LTO_ttw + LCIA_fossil_CCD_ttw + LCIA_saf_LTO_ttw + LCIA_saf_CCD_ttw + LCIA_h2_LTO_ttw + LCIA_h2_CCD_ttw
+    cirrus, cirrus_no_aaf_change, fuel_effect_correction_contrails, fuel_effect_correction_contrails_sens, distance_total = cirrus_kernel(saf_share, fleet, aircraft_char, cirrus_rf_change_h2)
+    emissions = emissions_from_LCIA(flight_start_year, flight_end_year, LCIA_ground, LCIA_flight, impact_categories, cirrus)
      
     # do LWE calculations
-    lwe_input['cirrus'] = cirrus_calc(hydrogen_share, saf_share, fleet, aircraft_char, cirrus_rf_change_h2)
-       
-    RF, RF_low, RF_high = emissions_to_LWE(lwe_input, flight_start_year, flight_end_year)
+    # the sensitivity analysis only changes the cirrus input, so the other substances are calculated once and only the cirrus term is calculated per variant
+    RF_base = emissions_to_LWE_batch(stack_emissions([emissions]), flight_start_year, flight_end_year)[0]
+    RF_batch = LWE_cirrus_variants(RF_base, np.stack([emissions['Cirrus'], cirrus_no_aaf_change]))
+    
+    RF, RF_low, RF_high = LWE_array_to_dfs(RF_batch[0], flight_start_year, flight_end_year)
     RF_basic = RF.iloc[:,0:2]
     
     LCIA_df['Radiative forcing'] = list(RF.sum(axis = 1))
@@ -1118,22 +1020,17 @@ def single_type_scenario(flight_start_year, flight_end_year, aircraft_dataframes
     LCIA_df['Radiative forcing (excl. aviation non-CO$_2$)'] = list(RF_basic.sum(axis = 1))
 
     # additional RF calculations for sensitivity analysis
-    no_aaf_change_lwe_input = lwe_input.copy()
-    no_aaf_change_lwe_input['cirrus'] = cirrus_calc(hydrogen_share, saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=True)
-    RF_no_AAF_change, RF_low_no_AAF_change, RF_high_no_AAF_change = emissions_to_LWE(no_aaf_change_lwe_input, flight_start_year, flight_end_year)
+    RF_no_AAF_change, RF_low_no_AAF_change, RF_high_no_AAF_change = LWE_array_to_dfs(RF_batch[1], flight_start_year, flight_end_year)
 
     LCIA_df['Radiative forcing (excl. AAF change to AIC, mean)'] = list(RF_no_AAF_change.sum(axis = 1))
     LCIA_df['Radiative forcing (excl. AAF change to AIC, 5%)'] = list(RF_low_no_AAF_change.sum(axis = 1))
     LCIA_df['Radiative forcing (excl. AAF change to AIC, 95%)'] = list(RF_high_no_AAF_change.sum(axis = 1))
 
     # do GWP* calculations
-    distance_total = (fleet*aircraft_char.loc['yearly distance']).fillna(0).sum(axis=1)
-    fuel_effect_correction_contrails = calc_cirrus_change(saf_share, fleet, aircraft_char, cirrus_rf_change_h2)
-    GWPstar_df_climate = perform_GWPstar_calc(flight_start_year, flight_end_year, lwe_input, distance_total, fuel_effect_correction_contrails)
-
-    # and again for sensitivity analysis
-    fuel_effect_correction_contrails_sens = calc_cirrus_change(saf_share, fleet, aircraft_char, cirrus_rf_change_h2, no_aaf_change=True)
-    GWPstar_df_climate_sens = perform_GWPstar_calc(flight_start_year, flight_end_year, lwe_input, distance_total, fuel_effect_correction_contrails_sens)
+    # and again for sensitivity analysis, as a contrail variant of the same emissions (so only the contrail terms are calculated twice)
+    GWPstar_batch = perform_GWPstar_calc_batch(flight_start_year, flight_end_year, stack_emissions([emissions]), distance_total[None], np.stack([fuel_effect_correction_contrails, fuel_effect_correction_contrails_sens]))
+    GWPstar_df_climate = GWPstar_batch.loc[0].rename_axis(None)
+    GWPstar_df_climate_sens = GWPstar_batch.loc[1].rename_axis(None)
 
     # export additional variables for plotting
     electricity_demands = LCIAs_fuels_wtt[6]
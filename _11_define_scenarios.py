@@ -1,5 +1,13 @@
 import pandas as pd
 import numpy as np
+import functools
+import hashlib
+import logging
+import pickle
+import shutil
+import glob
+import os
+import types
 from _10_functions import *
 
 #%% the scenario variables (traffic growth, technological performance, etc.) are defined by calling the below functions
@@ -265,10 +273,156 @@ def define_HC_performance(tech_improvements):
     
     return NB_upcoming_H2_change, NB_future_H2_change, WB_future_H2_change
 
+#%% characteristics of all fuel plants (see define_plant_chars), which only depend on the performance of each plant type and the plant years
+# cached, as the same few combinations are used by many scenarios; for that reason, the mappings returned are read-only, as are the plant characteristics tables
+@functools.lru_cache(maxsize = None)
+def plant_performance_chars(PEM_performance, DAC_performance, FT_performance, LIQ_performance, y_plants_start, y_plants_end, plants):
+    PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped = define_PEM_performance(PEM_performance, y_plants_start, y_plants_end)
+    DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0 = define_DAC_performance(DAC_performance, y_plants_start, y_plants_end)
+    FT_elec, FT_co2, FT_h2, FT_co2_emissions = define_FT_performance(FT_performance, y_plants_start, y_plants_end)
+    LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped  = define_LIQ_performance(LIQ_performance, y_plants_start, y_plants_end)
+    plant_chars, plant_ages = define_plant_chars(y_plants_start, y_plants_end, list(plants), PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped)
+    return types.MappingProxyType(plant_chars), types.MappingProxyType(plant_ages)
+
 #%% some functions used when running a large number of scenarios
 def scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen):
     scenario_name = pathway+' pathway; hydrogen from '+hydrogen_source+'; '+growth+'; '+aircraft_tech+' aircraft development ('+lh2_tech+' relative development of LH$_2$ aircraft); '+capacity*'capacity improved; '+'AAF with '+e_fuel+'; '+hydrogen*'LH$_2$ aircraft implemented; '+fuel_tech+' fuel technology development.'
     return scenario_name
 
 def retrieve_scenario_results(scenario_name, all_scenario_names, all_scenario_results):
-    return all_scenario_results[list(all_scenario_names).index(scenario_name)]
\ No newline at end of file
+    return all_scenario_results[list(all_scenario_names).index(scenario_name)]
+
+#%% store of scenario results: a folder per scenario (named after a hash of its scenario variables and the data it uses), with a file per item of the scenario results
+# numerical dataframes and series are stored as .npy arrays (one contiguous column after the other) that are memory-mapped when read, so that only the columns that are used are read from disk
+# the arrays are mapped copy-on-write: results can be changed in place, without changing the stored files
+scenario_result_items = ['LCIA per aircraft', 'LCIA', 'RF', 'RF low', 'RF high', 'RF basic', 'fleet', 'inflow', 'total fuel', 'electricity demands', 'fuel capacities', 'electricity by fuel', 'fuel capacities added', 
+                         'RPK per aircraft', 'MJ per RPK', 'RPK total per fuel', 'fossil by aircraft', 'SAF by aircraft', 'hydrogen by aircraft', 'hydrogen demands', 
+                         'RF no AAF change', 'RF low no AAF change', 'RF high no AAF change', 'aircraft char', 'GWPstar climate', 'GWPstar climate sens', 'start year'] # in the order of the list returned by run_scenario
+
+def scenario_key(scenario, data_hash = ''):
+    return hashlib.sha256((repr(tuple(scenario)) + data_hash).encode()).hexdigest()[:16]
+
+def is_stored(folder, scenario, data_hash = ''):
+    return os.path.isdir(os.path.join(folder, scenario_key(scenario, data_hash)))
+
+def is_numerical(item):
+    if isinstance(item, pd.Series): return pd.api.types.is_numeric_dtype(item.dtype)
+    return isinstance(item, pd.DataFrame) and len(set(item.dtypes)) == 1 and pd.api.types.is_numeric_dtype(item.dtypes.iloc[0])
+
+def store_scenario_results(folder, scenario, scenario_results, data_hash = ''):
+    scenario_folder = os.path.join(folder, scenario_key(scenario, data_hash))
+    # write to a temporary folder first, so that an interrupted run cannot leave an incomplete scenario behind
+    temporary_folder = scenario_folder+'.tmp'
+    shutil.rmtree(temporary_folder, ignore_errors = True)
+    os.makedirs(temporary_folder)
+    for i, item in enumerate(scenario_results):
+        if isinstance(item, (pd.DataFrame, pd.Series)): item = item.infer_objects() # numbers of object dtype (e.g., calculated with the rows of aircraft_char) are stored as numbers
+        if is_numerical(item):
+            np.save(os.path.join(temporary_folder, f'{i:02d}.npy'), np.asfortranarray(item.to_numpy()))
+            labels = (item.index, item.columns) if isinstance(item, pd.DataFrame) else (item.index, item.name)
+        else: labels = item # other items (e.g., dictionaries of dataframes) are pickled as a whole
+        with open(os.path.join(temporary_folder, f'{i:02d}.pkl'), 'wb') as f:
+            pickle.dump(labels, f)
+    with open(os.path.join(temporary_folder, 'scenario.pkl'), 'wb') as f:
+        pickle.dump(tuple(scenario), f)
+    shutil.rmtree(scenario_folder, ignore_errors = True)
+    os.replace(temporary_folder, scenario_folder)
+
+# results of a stored scenario, which behave like the list returned by run_scenario (including slicing, which returns a list); items are only read when they are used
+class StoredScenarioResults:
+    def __init__(self, scenario_folder):
+        self.scenario_folder = scenario_folder
+        self.n_items = len(glob.glob(os.path.join(glob.escape(scenario_folder), '[0-9][0-9].pkl')))
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(len(self)))]
+        if isinstance(i, str): i = scenario_result_items.index(i) # items can also be selected by name
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(f"scenario results have {len(self)} items")
+        with open(os.path.join(self.scenario_folder, f'{i:02d}.pkl'), 'rb') as f:
+            labels = pickle.load(f)
+        array_name = os.path.join(self.scenario_folder, f'{i:02d}.npy')
+        if not os.path.exists(array_name): return labels
+        values = np.load(array_name, mmap_mode = 'c')
+        if values.ndim == 1: return pd.Series(values, index = labels[0], name = labels[1], copy = False)
+        return pd.DataFrame(values, index = labels[0], columns = labels[1], copy = False)
+    
+    def __len__(self):
+        return self.n_items
+    
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def stored_scenarios(folder):
+    scenarios = {}
+    for scenario_file in glob.glob(os.path.join(glob.escape(folder), '*', 'scenario.pkl')):
+        if os.path.dirname(scenario_file).endswith('.tmp'): continue # incomplete scenario
+        with open(scenario_file, 'rb') as f:
+            scenarios[pickle.load(f)] = os.path.dirname(scenario_file)
+    return scenarios
+
+# remove stored results of the given scenarios that were calculated with other data (and incomplete results), so that each scenario is stored once
+def remove_stale_scenarios(folder, scenarios, data_hashes):
+    current_keys = {tuple(scenario): scenario_key(scenario, data_hash) for scenario, data_hash in zip(scenarios, data_hashes)}
+    for scenario_folder in glob.glob(os.path.join(glob.escape(folder), '*.tmp')):
+        shutil.rmtree(scenario_folder)
+    for scenario_file in glob.glob(os.path.join(glob.escape(folder), '*', 'scenario.pkl')):
+        with open(scenario_file, 'rb') as f:
+            scenario = pickle.load(f)
+        scenario_folder = os.path.dirname(scenario_file)
+        if scenario in current_keys and os.path.basename(scenario_folder) != current_keys[scenario]:
+            shutil.rmtree(scenario_folder)
+            logging.info(f"Removed outdated results of scenario {scenario}")
+
+# read stored scenarios (all scenarios in the folder, or the given ones, in that order) as lists of scenario names and results, as used for plotting
+def load_scenario_grid(folder, scenarios = None):
+    available = stored_scenarios(folder)
+    if scenarios is None: scenarios = list(available.keys())
+    missing = [scenario for scenario in scenarios if tuple(scenario) not in available]
+    if missing != []: raise KeyError(f"{len(missing)} scenario(s) not stored in {folder}, e.g. {missing[0]}")
+    all_scenario_names = [scenario_name_generator(*scenario) for scenario in scenarios]
+    all_scenario_results = [StoredScenarioResults(available[tuple(scenario)]) for scenario in scenarios]
+    return all_scenario_names, all_scenario_results
+
+#%% functions that enumerate the combinations of scenario variables executed in _20_run_scenarios.py, in the order in which they are executed
+# each scenario is a tuple of the arguments of scenario_name_generator
+def foreground_scenarios(scenarios_pathways, hydrogen_sources, growth_scenarios, aircraft_techs, lh2_techs, fuel_techs, capacity_impl, e_fuel_impl, hydrogen_impl):
+    scenarios = []
+    for e_fuel in e_fuel_impl:
+        if e_fuel == 'no ReFuelEU': # only run a few scenarios here
+            for aircraft_tech in aircraft_techs:
+                for growth in growth_scenarios:
+                    for capacity in capacity_impl:
+                        scenarios.append((scenarios_pathways[0], 'grid', growth, aircraft_tech, 'low', 'low', capacity, e_fuel, False))
+        else:
+            for pathway in scenarios_pathways:
+                for hydrogen_source in hydrogen_sources:
+                    for growth in growth_scenarios:
+                        for aircraft_tech in aircraft_techs:
+                            for capacity in capacity_impl:
+                                for fuel_tech in fuel_techs:
+                                    for hydrogen in hydrogen_impl:
+                                        # only one scenario if hydrogen == False, since difference in LH2_tech has no effect
+                                        for lh2_tech in (lh2_techs if hydrogen == True else ['low']):
+                                            scenarios.append((pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen))
+    return scenarios
+
+def background_scenarios(scenarios_pathways, hydrogen_sources, growth_scenarios, aircraft_techs, lh2_techs, fuel_techs, capacity_impl, e_fuel_impl, hydrogen_impl):
+    scenarios = []
+    for e_fuel in e_fuel_impl:
+        for pathway in scenarios_pathways:
+            for hydrogen_source in hydrogen_sources:
+                for growth in growth_scenarios:
+                    for aircraft_tech in aircraft_techs:
+                        for capacity in capacity_impl:
+                            for fuel_tech in fuel_techs:
+                                for hydrogen in hydrogen_impl:
+                                    fuel_tech_here = fuel_tech
+                                    hydrogen_here = hydrogen
+                                    if e_fuel == 'no ReFuelEU': 
+                                        hydrogen_here = False
+                                        fuel_tech_here = 'low'
+                                    # only one scenario if hydrogen_here == False, since difference in LH2_tech has no effect
+                                    for lh2_tech in (lh2_techs if hydrogen_here == True else ['low']):
+                                        scenarios.append((pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech_here, capacity, e_fuel, hydrogen_here))
+    return scenarios
@@ -1,16 +1,18 @@
 import pandas as pd
 import numpy as np
 from scipy.linalg import toeplitz
+from scipy.signal import fftconvolve, lfilter
 import warnings
 warnings.filterwarnings("ignore")
 import itertools
+import functools
 
 def nan_helper(y):
     return np.isnan(y), lambda z: z.nonzero()[0]
 
-# returns linear operator to convert emissions to forcing
+# returns the kernel of the linear operator to convert emissions to forcing (i.e., the forcing in each year after a unit emission)
 # from Lynch et al. 2021
-def EFmod(nyr,a):
+def EF_kernel(nyr,a):
     Fcal = np.zeros((nyr)) # create linear operator to convert emissions to forcing
     time = np.arange(nyr+1)    # extend time array to compute derivatives
     F_0 = a[4]*a[13]*a[0]*time # compute constant term (if there is one, otherwise a[0]=0)
@@ -19,155 +21,279 @@ def EFmod(nyr,a):
     for i in range(0,nyr):     # first-difference AGWP to obtain AGFP
         Fcal[i]=F_0[i+1]-F_0[i]
 
+    return Fcal
+
+# returns linear operator to convert emissions to forcing
+# from Lynch et al. 2021
+def EFmod(nyr,a):
+    Fcal = EF_kernel(nyr,a)
     return toeplitz(Fcal, np.zeros_like(Fcal))
 
-def emissions_to_LWE(df_emissions, start, end):
-    # Radiative forcing for SLCPs
-    # mW/m^2/Mt
-
-    # we rename the columns for simplicity
-    df = df_emissions.copy()
-    df.columns = ['Tg/year', 'HFC-152a', 'H',
-                   'HCFC-140', 'HCFC-22', 'CH4', 'HFC-134a', 'R-10',
-                   'HFC-125', 'CFC-11', 'HFC-143a', 'CFC-113',
-                   'CO2', 'CO2 (flight)', 'NOx',
-                   'BC', 'SOx', 'H2O', 'Cirrus']
-    df['H2O'] = df['H2O']*1000 # unit conversion from m3 to kg
-    
-    df = df.fillna(0)
-    
-    RFI = {
-        "low": {
-            "HFC-152a":8.71e-12 * 1e9 * 1e3,
-            "H": 3.64e-13 * 1e9 * 1e3,
-            "HCFC-140": 2.75e-12 * 1e9 * 1e3,
-            "HCFC-22": 1.4e-11 * 1e9 * 1e3,
-            "CH4": 1.36e-13 * 1e9 * 1e3,
-            "HFC-134a": 9.23e-12 * 1e9 * 1e3,
-            "R-10": 6.09e-12 * 1e9 * 1e3,
-            "HFC-125": 1.1e-11 * 1e9 * 1e3,
-            "CFC-11": 1.06e-11 * 1e9 * 1e3,
-            "HFC-143a": 1.13e-11 * 1e9 * 1e3,
-            "CFC-113": 9.06e-12 * 1e9 * 1e3,
-            "CO2": 1.70E-15 * 1e9 * 1e3,
-            "NOx": -7.87 * (14/46), # RF coeff. for NOx
-            "BC": 7.95, # RF coeff. for BC
-            "SOx": -49.78, # RF coeff. for SO4
-            "H2O": 0.0021, # RF coeff. for H2O
-            "Cirrus": 6.3e-10# RF coeff. for Cirrus
-        },
-        "medium": {
-            "HFC-152a": 8.71e-12 * 1e9 * 1e3,
-            "H": 3.64e-13 * 1e9 * 1e3,
-            "HCFC-140": 2.75e-12 * 1e9 * 1e3,
-            "HCFC-22": 1.4e-11 * 1e9 * 1e3,
-            "CH4": 1.36e-13 * 1e9 * 1e3,
-            "HFC-134a": 9.23e-12 * 1e9 * 1e3,
-            "R-10": 6.09e-12 * 1e9 * 1e3,
-            "HFC-125": 1.1e-11 * 1e9 * 1e3,
-            "CFC-11": 1.06e-11 * 1e9 * 1e3,
-            "HFC-143a": 1.13e-11 * 1e9 * 1e3,
-            "CFC-113": 9.06e-12 * 1e9 * 1e3,
-            "CO2": 1.70E-15 * 1e9 * 1e3,
-            "NOx": 5.5 * (14/46), # RF coeff. for NOx
-            "BC": 100.67, # RF coeff. for BC
-            "SOx": -19.91, # RF coeff. for SO4
-            "H2O": 0.0052, # RF coeff. for H2O
-            "Cirrus": 9.36e-10 # RF coeff. for Cirrus
-        },
-        "high": {
-            "HFC-152a":8.71e-12 * 1e9 * 1e3,
-            "H": 3.64e-13 * 1e9 * 1e3,
-            "HCFC-140": 2.75e-12 * 1e9 * 1e3,
-            "HCFC-22": 1.4e-11 * 1e9 * 1e3,
-            "CH4": 1.36e-13 * 1e9 * 1e3,
-            "HFC-134a": 9.23e-12 * 1e9 * 1e3,
-            "R-10": 6.09e-12 * 1e9 * 1e3,
-            "HFC-125": 1.1e-11 * 1e9 * 1e3,
-            "CFC-11": 1.06e-11 * 1e9 * 1e3,
-            "HFC-143a": 1.13e-11 * 1e9 * 1e3,
-            "CFC-113": 9.06e-12 * 1e9 * 1e3,
-            "CO2": 1.70E-15 * 1e9 * 1e3,
-            "NOx": 12.57 * (14/46), # RF coeff. for NOx
-            "BC": 428.65, # RF coeff. for BC
-            "SOx": -6.87, # RF coeff. for SO4
-            "H2O": 0.0083, # RF coeff. for H2O
-            "Cirrus": 1.39e-9 # RF coeff. for Cirrus
-        }
-    }
-    
-    # molecular mass for SLCPs
-    # kg/mol
-    mol_mass = {
-        "HFC-152a":66.05 / 1e3,
-        "H": 1.01 / 1e3,
-        "HCFC-140": 133.4 / 1e3,
-        "HCFC-22": 86.47 / 1e3,
-        "CH4": 16.04 / 1e3,
-        "HFC-134a": 102.03 / 1e3,
-        "R-10": 153.823 / 1e3,
-        "HFC-125": 120.02 / 1e3,
-        "CFC-11": 137.37 / 1e3,
-        "HFC-143a": 84.04 / 1e3,
-        "CFC-113": 187.375 / 1e3,
-        'NOx': 14/1e3,
-        'BC': 12/1e3, 
-        'SOx': 64/1e3, 
-        'H2O': 18/1e3,
-        "Cirrus": 0
-    }
-    
-    # lifetimes for SLCPs
-    # years
-    RF_lifetime = {
-        "HFC-152a":1.6,
-        "H": 2.5,
-        "HCFC-140": 5,
-        "HCFC-22": 11.9,
-        "CH4": 11.8,
-        "HFC-134a": 14,
-        "R-10": 32,
-        "HFC-125": 30,
-        "CFC-11": 52,
-        "HFC-143a": 51,
-        "CFC-113": 93,
-        'NOx': 0.267, # changed from 11.8, based on Fuglestvedt et al. (2010)
-        'BC': 0.02, 
-        'SOx': 0.011, 
-        'H2O': 0.8,
-        "Cirrus": 0.00057
+# cached EFmod: the operators only depend on the length of the time series and the parameters (passed as a tuple)
+# so they can be reused by each scenario run over the same years
+@functools.lru_cache(maxsize=128)
+def EFmod_cached(nyr,a):
+    operator = EFmod(nyr,np.array(a))
+    operator.flags.writeable = False # shared between calls through the cache
+    return operator
+
+# converts a time series of emissions to forcing, using one of several methods:
+# 'matrix': multiplication with the Toeplitz matrix of EFmod, which costs O(n^2)
+# 'fft': FFT convolution with the kernel of EFmod, which costs O(n log n)
+# 'recursive': as the kernel is a constant plus a sum of exponentials, each term can be applied as a recursive (IIR) filter, which costs O(n)
+# the latter two can be used for long time series (e.g., for long-run warming checks), for which the matrix becomes large
+def EF_apply(emissions,a,method='matrix'):
+    emissions = np.asarray(emissions, dtype=float)
+    nyr = emissions.shape[-1] # years are on the last axis (other axes, e.g. scenarios, are converted at once)
+    if method == 'matrix':
+        if emissions.ndim == 1: return EFmod_cached(nyr,tuple(a)) @ emissions
+        return emissions @ EFmod_cached(nyr,tuple(a)).T
+    if method == 'fft':
+        return fftconvolve(np.broadcast_to(EF_kernel(nyr,a), emissions.shape), emissions, axes=-1)[..., :nyr]
+    if method == 'recursive':
+        forcing = a[4]*a[13]*a[0]*np.cumsum(emissions, axis=-1) # constant term
+        for j in [1,2,3]: # gas decay terms: forcing[i] = decay*forcing[i-1] + (forcing of a unit emission in its first year)*emissions[i]
+            decay = np.exp(-1/a[j+5])
+            forcing = forcing + lfilter([a[j]*a[4]*a[13]*a[j+5]*-np.expm1(-1/a[j+5])], [1, -decay], emissions)
+        return forcing
+    raise ValueError(f"Unknown method to convert emissions to forcing: {method}")
+
+
+#%% parameters of the LWE calculations
+
+# substances in the emissions input (after the column of years), in order
+LWE_substances = ['HFC-152a', 'H',
+                  'HCFC-140', 'HCFC-22', 'CH4', 'HFC-134a', 'R-10',
+                  'HFC-125', 'CFC-11', 'HFC-143a', 'CFC-113',
+                  'CO2', 'CO2 (flight)', 'NOx',
+                  'BC', 'SOx', 'H2O', 'Cirrus']
+
+# columns of the RF results, and RF efficacy levels in the order they are returned by emissions_to_LWE (mean, 5%, 95%)
+LWE_columns = ["net CO2", "surface - Others", "flight - Cirrus", "flight - NOx", "flight - Others"]
+LWE_levels = ["medium", "low", "high"]
+
+# Radiative forcing for SLCPs
+# mW/m^2/Mt
+RFI = {
+    "low": {
+        "HFC-152a":8.71e-12 * 1e9 * 1e3,
+        "H": 3.64e-13 * 1e9 * 1e3,
+        "HCFC-140": 2.75e-12 * 1e9 * 1e3,
+        "HCFC-22": 1.4e-11 * 1e9 * 1e3,
+        "CH4": 1.36e-13 * 1e9 * 1e3,
+        "HFC-134a": 9.23e-12 * 1e9 * 1e3,
+        "R-10": 6.09e-12 * 1e9 * 1e3,
+        "HFC-125": 1.1e-11 * 1e9 * 1e3,
+        "CFC-11": 1.06e-11 * 1e9 * 1e3,
+        "HFC-143a": 1.13e-11 * 1e9 * 1e3,
+        "CFC-113": 9.06e-12 * 1e9 * 1e3,
+        "CO2": 1.70E-15 * 1e9 * 1e3,
+        "NOx": -7.87 * (14/46), # RF coeff. for NOx
+        "BC": 7.95, # RF coeff. for BC
+        "SOx": -49.78, # RF coeff. for SO4
+        "H2O": 0.0021, # RF coeff. for H2O
+        "Cirrus": 6.3e-10# RF coeff. for Cirrus
+    },
+    "medium": {
+        "HFC-152a": 8.71e-12 * 1e9 * 1e3,
+        "H": 3.64e-13 * 1e9 * 1e3,
+        "HCFC-140": 2.75e-12 * 1e9 * 1e3,
+        "HCFC-22": 1.4e-11 * 1e9 * 1e3,
+        "CH4": 1.36e-13 * 1e9 * 1e3,
+        "HFC-134a": 9.23e-12 * 1e9 * 1e3,
+        "R-10": 6.09e-12 * 1e9 * 1e3,
+        "HFC-125": 1.1e-11 * 1e9 * 1e3,
+        "CFC-11": 1.06e-11 * 1e9 * 1e3,
+        "HFC-143a": 1.13e-11 * 1e9 * 1e3,
+        "CFC-113": 9.06e-12 * 1e9 * 1e3,
+        "CO2": 1.70E-15 * 1e9 * 1e3,
+        "NOx": 5.5 * (14/46), # RF coeff. for NOx
+        "BC": 100.67, # RF coeff. for BC
+        "SOx": -19.91, # RF coeff. for SO4
+        "H2O": 0.0052, # RF coeff. for H2O
+        "Cirrus": 9.36e-10 # RF coeff. for Cirrus
+    },
+    "high": {
+        "HFC-152a":8.71e-12 * 1e9 * 1e3,
+        "H": 3.64e-13 * 1e9 * 1e3,
+        "HCFC-140": 2.75e-12 * 1e9 * 1e3,
+        "HCFC-22": 1.4e-11 * 1e9 * 1e3,
+        "CH4": 1.36e-13 * 1e9 * 1e3,
+        "HFC-134a": 9.23e-12 * 1e9 * 1e3,
+        "R-10": 6.09e-12 * 1e9 * 1e3,
+        "HFC-125": 1.1e-11 * 1e9 * 1e3,
+        "CFC-11": 1.06e-11 * 1e9 * 1e3,
+        "HFC-143a": 1.13e-11 * 1e9 * 1e3,
+        "CFC-113": 9.06e-12 * 1e9 * 1e3,
+        "CO2": 1.70E-15 * 1e9 * 1e3,
+        "NOx": 12.57 * (14/46), # RF coeff. for NOx
+        "BC": 428.65, # RF coeff. for BC
+        "SOx": -6.87, # RF coeff. for SO4
+        "H2O": 0.0083, # RF coeff. for H2O
+        "Cirrus": 1.39e-9 # RF coeff. for Cirrus
     }
+}
+
+# molecular mass for SLCPs
+# kg/mol
+mol_mass = {
+    "HFC-152a":66.05 / 1e3,
+    "H": 1.01 / 1e3,
+    "HCFC-140": 133.4 / 1e3,
+    "HCFC-22": 86.47 / 1e3,
+    "CH4": 16.04 / 1e3,
+    "HFC-134a": 102.03 / 1e3,
+    "R-10": 153.823 / 1e3,
+    "HFC-125": 120.02 / 1e3,
+    "CFC-11": 137.37 / 1e3,
+    "HFC-143a": 84.04 / 1e3,
+    "CFC-113": 187.375 / 1e3,
+    'NOx': 14/1e3,
+    'BC': 12/1e3, 
+    'SOx': 64/1e3, 
+    'H2O': 18/1e3,
+    "Cirrus": 0
+}
+
+# lifetimes for SLCPs
+# years
+RF_lifetime = {
+    "HFC-152a":1.6,
+    "H": 2.5,
+    "HCFC-140": 5,
+    "HCFC-22": 11.9,
+    "CH4": 11.8,
+    "HFC-134a": 14,
+    "R-10": 32,
+    "HFC-125": 30,
+    "CFC-11": 52,
+    "HFC-143a": 51,
+    "CFC-113": 93,
+    'NOx': 0.267, # changed from 11.8, based on Fuglestvedt et al. (2010)
+    'BC': 0.02, 
+    'SOx': 0.011, 
+    'H2O': 0.8,
+    "Cirrus": 0.00057
+}
+
+# first set up AR5 model parameters, using syntax of FaIRv1.3 but units of GtCO2, not GtC
+m_atm=5.1352*10**18 # AR5 official mass of atmosphere in kg
+m_air=28.97*10**-3  # AR5 official molar mass of air
+m_co2=44.01*10**-3  # AR5 official molar mass of CO2
+
+a_ar5=np.zeros(20)
+
+# Set to AR5 Values for CO2
+a_ar5[0:4] = [0.21787,0.22896,0.28454,0.26863]
+a_ar5[4] = 1.e12*1.e6/m_co2/(m_atm/m_air)# old value = 0.471 ppm/GtC # convert GtCO2 to ppm
+a_ar5[5:9] = [1.e8,381.330,34.7850,4.12370]
+a_ar5[10:12] = [0.631*0.7,0.429*0.7] #AR5 sensitivity coeffs multiplied by 0.7 to give ECS of 2.75K
+a_ar5[13] = 1.37e-2 # rad efficiency in W/m2/ppm
+a_ar5[14] = 0
+a_ar5[15:17] = [8.400,409.5]
+a_ar5[18:21] = 0
+
+d_map = {
+    "surface - CO2": "CO2",
+    "surface - Others": ['HFC-152a', 'H', 'HCFC-140', 'HCFC-22', 'CH4', 'HFC-134a', 'R-10', 'HFC-125', 'CFC-11', 'HFC-143a', 'CFC-113',],
+    "flight - CO2": "CO2 (flight)",
+    "flight - Cirrus": "Cirrus",
+    "flight - NOx": "NOx",
+    "flight - Others": ['BC', 'SOx', 'H2O']
+}
+d_map_rev = {
+    "CO2": "net CO2",
+    'HFC-152a': "surface - Others", 
+    'H': "surface - Others", 
+    'HCFC-140': "surface - Others", 
+    'HCFC-22': "surface - Others", 
+    'CH4': "surface - Others", 
+    'HFC-134a': "surface - Others", 
+    'R-10': "surface - Others", 
+    'HFC-125': "surface - Others", 
+    'CFC-11': "surface - Others", 
+    'HFC-143a': "surface - Others", 
+    'CFC-113': "surface - Others",
+    "CO2 (flight)": "net CO2",
+    "Cirrus": "flight - Cirrus",
+    "NOx": "flight - NOx",
+    'BC': "flight - Others", 
+    'SOx': "flight - Others", 
+    'H2O': "flight - Others"
+}
+
+# source of each substance in the LCIA results: (impact category, part of the life cycle), where 'flight' is fuel use in flight and 'ground' is everything else
+# cirrus is not an LCIA result, but calculated from the fleet
+LWE_inventory = {
+    'HFC-152a': ('Ethane, 1,1-difluoro-, HFC-152a', 'ground'),
+    'H': ('Hydrogen', 'ground'),
+    'HCFC-140': ('Ethane, 1,1,1-trichloro-, HCFC-140', 'ground'),
+    'HCFC-22': ('Methane, chlorodifluoro-, HCFC-22', 'ground'),
+    'CH4': ('Methane', 'ground'),
+    'HFC-134a': ('Ethane, 1,1,1,2-tetrafluoro-, HFC-134a', 'ground'),
+    'R-10': ('Methane, tetrachloro-, R-10', 'ground'),
+    'HFC-125': ('Ethane, pentafluoro-, HFC-125', 'ground'),
+    'CFC-11': ('Methane, trichlorofluoro-, CFC-11', 'ground'),
+    'HFC-143a': ('Ethane, 1,1,1-trifluoro-, HFC-143a', 'ground'),
+    'CFC-113': ('Ethane, 1,1,2-trichloro-1,2,2-trifluoro-, CFC-113', 'ground'),
+    'CO2': ('Carbon dioxide', 'ground'),
+    'CO2 (flight)': ('Carbon dioxide', 'flight'),
+    'NOx': ('Nitrogen oxides', 'flight'),
+    'BC': ('Particulate Matter', 'flight'),
+    'SOx': ('Sulfur dioxide', 'flight'),
+    'H2O': ('Water', 'flight'),
+}
+
+# returns the model parameters of an SLCP (i.e., not CO2) for one of the RF efficacy levels
+def substance_parameters(r, level):
+    # Set to AR6 Values for substance
+    a_sub=a_ar5.copy()
+    a_sub[0:4]=[0,1.0,0,0]
+    a_sub[4]= 1 # Mt
+    a_sub[5:9]= [1, RF_lifetime[r], 1, 1]
+    a_sub[13]= RFI[level][r] / 1e3 # Radiative efficiency in W/m2/Mton -- division by 1e3 to convry mW to W
+    return a_sub
+
+#%% emissions input of the climate models
+
+# emissions of a single scenario over the years from start to end, stored as one contiguous array per substance (the rows of data, in the order of LWE_substances)
+# units are those of the LCIA results (kg, except for H2O in m3), and those of cirrus_calc for cirrus
+class EmissionsRecord:
+    def __init__(self, start, end, data):
+        self.start = start
+        self.end = end
+        self.years = range(start, end + 1)
+        self.data = np.ascontiguousarray(data, dtype=float)
+        if self.data.shape != (len(LWE_substances), len(self.years)):
+            raise ValueError(f"Emissions should have shape {(len(LWE_substances), len(self.years))}, not {self.data.shape}")
     
-    # first set up AR5 model parameters, using syntax of FaIRv1.3 but units of GtCO2, not GtC
-    ny2=len(range(start, end + 1))
-    
-    m_atm=5.1352*10**18 # AR5 official mass of atmosphere in kg
-    m_air=28.97*10**-3  # AR5 official molar mass of air
-    m_co2=44.01*10**-3  # AR5 official molar mass of CO2
-    
-    a_ar5=np.zeros(20)
-    
-    # Set to AR5 Values for CO2
-    a_ar5[0:4] = [0.21787,0.22896,0.28454,0.26863]
-    a_ar5[4] = 1.e12*1.e6/m_co2/(m_atm/m_air)# old value = 0.471 ppm/GtC # convert GtCO2 to ppm
-    a_ar5[5:9] = [1.e8,381.330,34.7850,4.12370]
-    a_ar5[10:12] = [0.631*0.7,0.429*0.7] #AR5 sensitivity coeffs multiplied by 0.7 to give ECS of 2.75K
-    a_ar5[13] = 1.37e-2 # rad efficiency in W/m2/ppm
-    a_ar5[14] = 0
-    a_ar5[15:17] = [8.400,409.5]
-    a_ar5[18:21] = 0
-    
-    FCO2 = EFmod(ny2,a_ar5)
-    FCO2_inv = np.linalg.inv(FCO2)
+    def __getitem__(self, substance):
+        return self.data[LWE_substances.index(substance)]
+
+# returns the emissions of (year, impact category) arrays of the LCIA results of the ground and flight parts of the life cycle, plus cirrus
+def emissions_from_LCIA(start, end, LCIA_ground, LCIA_flight, impact_categories, cirrus):
+    LCIA_parts = {'ground': LCIA_ground, 'flight': LCIA_flight}
+    data = [LCIA_parts[part][:, impact_categories.index(impact_cat)] for impact_cat, part in [LWE_inventory[r] for r in LWE_substances[:-1]]]
+    return EmissionsRecord(start, end, data + [cirrus])
+
+# returns the emissions of a dataframe with a column of years followed by a column per substance (in the order of LWE_substances)
+def emissions_from_dataframe(df_emissions, start, end):
+    data = df_emissions.loc[df_emissions.iloc[:, 0].isin(range(start, end + 1))]
+    return EmissionsRecord(start, end, data.iloc[:, 1:len(LWE_substances) + 1].to_numpy(dtype=float).T)
+
+# stacks the emissions of several scenarios into a (scenario, substance, year) array, as input for the batched calculations
+def stack_emissions(records):
+    return np.stack([record.data for record in records])
+
+#%% LWE calculations
+
+# emissions can be an EmissionsRecord, or a dataframe in the format of emissions_from_dataframe
+def emissions_to_LWE(emissions, start, end, method='matrix'):
+    if not isinstance(emissions, EmissionsRecord):
+        emissions = emissions_from_dataframe(emissions, start, end)
     
     RF = pd.DataFrame(
-        columns=[
-            "net CO2",
-            "surface - Others",
-            "flight - Cirrus",
-            "flight - NOx",
-            "flight - Others"
-        ],
+        columns=LWE_columns,
         index = range(start, end + 1)
     )
 
@@ -178,73 +304,65 @@ def emissions_to_LWE(df_emissions, start, end):
     RF_low.loc[:, :] = 0
     RF_high.loc[:, :] = 0
     
-    d_map = {
-        "surface - CO2": "CO2",
-        "surface - Others": ['HFC-152a', 'H', 'HCFC-140', 'HCFC-22', 'CH4', 'HFC-134a', 'R-10', 'HFC-125', 'CFC-11', 'HFC-143a', 'CFC-113',],
-        "flight - CO2": "CO2 (flight)",
-        "flight - Cirrus": "Cirrus",
-        "flight - NOx": "NOx",
-        "flight - Others": ['BC', 'SOx', 'H2O']
-    }
-    d_map_rev = {
-        "CO2": "net CO2",
-        'HFC-152a': "surface - Others", 
-        'H': "surface - Others", 
-        'HCFC-140': "surface - Others", 
-        'HCFC-22': "surface - Others", 
-        'CH4': "surface - Others", 
-        'HFC-134a': "surface - Others", 
-        'R-10': "surface - Others", 
-        'HFC-125': "surface - Others", 
-        'CFC-11': "surface - Others", 
-        'HFC-143a': "surface - Others", 
-        'CFC-113': "surface - Others",
-        "CO2 (flight)": "net CO2",
-        "Cirrus": "flight - Cirrus",
-        "NOx": "flight - NOx",
-        'BC': "flight - Others", 
-        'SOx': "flight - Others", 
-        'H2O': "flight - Others"
-    }
-    
-    # slice data of interest
-    data = df.loc[:, :'Cirrus']
-    data = data.loc[data["Tg/year"].isin(range(start, end + 1))]
-    
-    for r in data.loc[:, 'HFC-152a': 'Cirrus'].columns:
+    for r in LWE_substances:
+        data = np.nan_to_num(emissions[r]*1000 if r == 'H2O' else emissions[r]) # unit conversion from m3 to kg for H2O
         if r not in ["CO2", "CO2 (flight)"]:
-            # Set to AR6 Values for substance
-            a_sub=a_ar5.copy()
-            a_sub[0:4]=[0,1.0,0,0]
-            a_sub[4]= 1 # Mt
-            a_sub[5:9]= [1, RF_lifetime[r], 1, 1]
-            a_sub[13]= RFI["medium"][r] / 1e3 # Radiative efficiency in W/m2/Mton -- division by 1e3 to convry mW to W
-            
-            a_sub_low = a_sub.copy()
-            a_sub_low[13] = RFI["low"][r] / 1e3 # Radiative efficiency in W/m2/Mton -- division by 1e3 to convry mW to W
-            
-            a_sub_high = a_sub.copy()
-            a_sub_high[13] = RFI["high"][r] / 1e3 # Radiative efficiency in W/m2/Mton -- division by 1e3 to convry mW to W
+            a_sub = substance_parameters(r, "medium")
+            a_sub_low = substance_parameters(r, "low")
+            a_sub_high = substance_parameters(r, "high")
     
-            Fsub = EFmod(ny2, a_sub)
-            Fsub_low = EFmod(ny2, a_sub_low)
-            Fsub_high = EFmod(ny2, a_sub_high)
-            
             if r != "Cirrus":
                 # LWE = FCO2^-1 * Fsub * Esub
-                RF.loc[:, d_map_rev[r]] += Fsub@(data.loc[:, r] / 1e9 * 1e3) # <-- W to mW
-                RF_low.loc[:, d_map_rev[r]] += Fsub_low@(data.loc[:, r] / 1e9 * 1e3) # <-- W to mW
-                RF_high.loc[:, d_map_rev[r]] += Fsub_high@(data.loc[:, r] / 1e9 * 1e3) # <-- W to mW
+                RF.loc[:, d_map_rev[r]] += EF_apply(data / 1e9 * 1e3, a_sub, method) # <-- W to mW
+                RF_low.loc[:, d_map_rev[r]] += EF_apply(data / 1e9 * 1e3, a_sub_low, method) # <-- W to mW
+                RF_high.loc[:, d_map_rev[r]] += EF_apply(data / 1e9 * 1e3, a_sub_high, method) # <-- W to mW
                 
             else:
-                RF.loc[:, "flight - Cirrus"] = (data.loc[:, r]).values * RFI["medium"][r]
-                RF_low.loc[:, "flight - Cirrus"] = (data.loc[:, r]).values * RFI["low"][r]
-                RF_high.loc[:, "flight - Cirrus"] = (data.loc[:, r]).values * RFI["high"][r]
+                RF.loc[:, "flight - Cirrus"] = data * RFI["medium"][r]
+                RF_low.loc[:, "flight - Cirrus"] = data * RFI["low"][r]
+                RF_high.loc[:, "flight - Cirrus"] = data * RFI["high"][r]
                 
         else:
             # LWE = FCO2^-1 * Fsub * Esub
-            RF.loc[:, d_map_rev[r]] += FCO2@(data.loc[:, r] / 1e9).values # <-- W to mW
-            RF_low.loc[:, d_map_rev[r]] += FCO2@(data.loc[:, r] / 1e9).values # <-- W to mW
-            RF_high.loc[:, d_map_rev[r]] += FCO2@(data.loc[:, r] / 1e9).values # <-- W to mW
+            RF.loc[:, d_map_rev[r]] += EF_apply(data / 1e9, a_ar5, method) # <-- W to mW
+            RF_low.loc[:, d_map_rev[r]] += EF_apply(data / 1e9, a_ar5, method) # <-- W to mW
+            RF_high.loc[:, d_map_rev[r]] += EF_apply(data / 1e9, a_ar5, method) # <-- W to mW
+
+    return RF.astype(float), RF_low.astype(float), RF_high.astype(float)
+
+#%% batched LWE calculations, for several scenarios at once
+
+# batched version of emissions_to_LWE
+# takes emissions as a (scenario, substance, year) array (see stack_emissions), with substances in the order of LWE_substances and years from start to end
+# returns RF as a (scenario, level, year, column) array, with levels in the order of LWE_levels and columns in the order of LWE_columns
+# axis order: the years are the last axis, as EF_apply converts emissions to forcing along the last axis; the substances have their own axis, as each substance is
+# converted separately (for all scenarios at once, with the same methods as emissions_to_LWE), since its forcing parameters differ per substance and level
+# (this avoids building one operator for all substances and years, which would mostly consist of zeros)
+def emissions_to_LWE_batch(emissions, start, end, method='matrix'):
+    nyr = len(range(start, end + 1))
+    emissions = np.nan_to_num(np.asarray(emissions, dtype=float))
+    RF = np.zeros((len(emissions), len(LWE_levels), nyr, len(LWE_columns)))
+    for s, r in enumerate(LWE_substances):
+        data = emissions[:, s]*1000 if r == 'H2O' else emissions[:, s] # unit conversion from m3 to kg for H2O
+        c = LWE_columns.index(d_map_rev[r])
+        if r in ["CO2", "CO2 (flight)"]:
+            RF[..., c] += EF_apply(data / 1e9, a_ar5, method)[:, None, :] # the same for each level
+        elif r == "Cirrus":
+            RF[..., c] = data[:, None, :] * np.array([RFI[level][r] for level in LWE_levels])[None, :, None] # no forcing model, but direct scaling
+        else:
+            for l, level in enumerate(LWE_levels):
+                RF[:, l, :, c] += EF_apply(data / 1e9 * 1e3, substance_parameters(r, level), method) # <-- W to mW
+    return RF
+
+# returns the RF of variants of the cirrus input, as a (variant, level, year, column) array, based on the RF of a single scenario from emissions_to_LWE_batch (a (level, year, column) array)
+# as cirrus only contributes (linearly) to the cirrus column, the RF of the other substances is reused and only the cirrus column is calculated per variant (the cirrus input of the base scenario is not used)
+def LWE_cirrus_variants(RF, cirrus):
+    cirrus = np.nan_to_num(np.asarray(cirrus, dtype=float))
+    RF_variants = np.repeat(RF[None], len(cirrus), axis=0)
+    RFI_cirrus = np.array([RFI[level]["Cirrus"] for level in LWE_levels])
+    RF_variants[..., LWE_columns.index("flight - Cirrus")] = cirrus[:, None, :] * RFI_cirrus[None, :, None]
+    return RF_variants
 
-    return RF.astype(float), RF_low.astype(float), RF_high.astype(float)
\ No newline at end of file
+# returns the RF of one scenario from emissions_to_LWE_batch as dataframes, in the same format as emissions_to_LWE
+def LWE_array_to_dfs(RF, start, end):
+    return tuple(pd.DataFrame(RF[l], columns = LWE_columns, index = range(start, end + 1)) for l in range(len(LWE_levels)))
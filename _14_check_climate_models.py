@@ -0,0 +1,94 @@
+import numpy as np
+import logging
+logging.basicConfig(level=logging.INFO)
+
+from _12_LWE_function import *
+from _13_GWPstar_functions import *
+
+#%% checks of the alternative and batched calculations of the climate models, using random emissions
+# each check returns the largest deviation from the reference calculation, relative to the largest absolute value of each result column
+
+# largest relative deviation between two dataframes (or arrays) of results, per column
+def max_relative_deviation(results, results_reference):
+    results = np.asarray(results, dtype=float)
+    results_reference = np.asarray(results_reference, dtype=float)
+    scale = np.nanmax(np.abs(results_reference), axis=0)
+    scale[~(scale > 0)] = 1 # columns without values are compared in absolute terms
+    return np.nanmax(np.abs(results - results_reference) / scale)
+
+# 'fft' and 'recursive' methods of emissions_to_LWE, and all methods of emissions_to_LWE_batch, against the 'matrix' method of emissions_to_LWE
+def LWE_methods_max_deviation(start=2024, end=2070, seed=0):
+    rng = np.random.default_rng(seed)
+    emissions = EmissionsRecord(start, end, rng.random((len(LWE_substances), end - start + 1)) * 1e9)
+    results_matrix = emissions_to_LWE(emissions, start, end, method='matrix')
+    results_batch = [LWE_array_to_dfs(emissions_to_LWE_batch(stack_emissions([emissions, emissions]), start, end, method)[1], start, end) for method in ['matrix', 'fft', 'recursive']]
+    deviation = 0.0
+    for results_method in [emissions_to_LWE(emissions, start, end, method='fft'), emissions_to_LWE(emissions, start, end, method='recursive')] + results_batch:
+        for RF_matrix, RF_method in zip(results_matrix, results_method):
+            deviation = max(deviation, max_relative_deviation(RF_method, RF_matrix))
+    return deviation
+
+# reference calculation of the GWP* climate results of gwpstar_climate_batch for a single scenario, year by year as in AeroMAPS (inputs are arrays over the years)
+def gwpstar_climate_reference(co2_emissions, nox_emissions, soot_emissions, h2o_emissions, sulfur_emissions, ch4_emissions, h2_emissions, total_aircraft_distance, fuel_effect_correction_contrails):
+    n_years = len(co2_emissions)
+    co2_agwp_h = AbsoluteGlobalWarmingPotentialCO2Function(100)
+    n_emissions = nox_emissions * 14 / 46
+    erf = {
+        "contrails": total_aircraft_distance * erf_coefficient_contrails * fuel_effect_correction_contrails,
+        "nox_short_term_o3_increase": n_emissions * erf_coefficient_nox_short_term_o3_increase,
+        "nox_long_term_o3_decrease": n_emissions * erf_coefficient_nox_long_term_o3_decrease,
+        "nox_ch4_decrease": n_emissions * erf_coefficient_nox_ch4_decrease,
+        "nox_stratospheric_water_vapor_decrease": n_emissions * erf_coefficient_nox_stratospheric_water_vapor_decrease,
+        "soot": soot_emissions * erf_coefficient_soot,
+        "h2o": h2o_emissions * erf_coefficient_h2o,
+        "sulfur": sulfur_emissions * erf_coefficient_sulfur,
+        "ch4": ch4_emissions * erf_coefficient_ch4,
+        "h2": h2_emissions * erf_coefficient_h2,
+    }
+    results = {}
+    for name, variation_duration, s_coefficient in gwpstar_species():
+        g_coefficient = 1 if s_coefficient == 0 else (1 - np.exp(-s_coefficient / (1 - s_coefficient))) / s_coefficient
+        equivalent_emissions = np.zeros(n_years)
+        for k in range(n_years):
+            if k >= variation_duration: erf_variation = (erf[name][k] - erf[name][k - int(variation_duration)]) / variation_duration
+            else: erf_variation = erf[name][k] / variation_duration
+            equivalent_emissions[k] = g_coefficient * (1 - s_coefficient) * 100 / co2_agwp_h * erf_variation + g_coefficient * s_coefficient / co2_agwp_h * erf[name][k]
+        results[name + "_equivalent_emissions"] = equivalent_emissions
+    results["non_co2_equivalent_emissions"] = sum(results[name + "_equivalent_emissions"] for name, _, _ in gwpstar_species())
+    results["total_equivalent_emissions"] = co2_emissions + results["non_co2_equivalent_emissions"]
+    for name, emissions in [("co2", co2_emissions)] + [(name, results[name + "_equivalent_emissions"]) for name, _, _ in gwpstar_species()] + [("non_co2", results["non_co2_equivalent_emissions"])]:
+        cumulative_emissions = np.zeros(n_years)
+        for k in range(n_years):
+            cumulative_emissions[k] = (cumulative_emissions[k - 1] if k > 0 else 0) + emissions[k] / 1000
+        results["temperature_increase_from_" + name + "_from_aviation"] = tcre_coefficient * cumulative_emissions
+    results["temperature_increase_from_aviation"] = results["temperature_increase_from_co2_from_aviation"] + results["temperature_increase_from_non_co2_from_aviation"]
+    return results
+
+# gwpstar_climate_batch against gwpstar_climate_reference, for two scenarios that share their emissions but differ in their contrail correction (so that broadcasting is checked as well)
+def GWPstar_batch_max_deviation(start=2024, end=2070, seed=0):
+    rng = np.random.default_rng(seed)
+    n_years = end - start + 1
+    emissions = {name: rng.random(n_years) * 10 for name in ["co2_emissions", "nox_emissions", "soot_emissions", "h2o_emissions", "sulfur_emissions", "ch4_emissions", "h2_emissions"]}
+    total_aircraft_distance = rng.random(n_years) * 1e10
+    fuel_effect_correction_contrails = rng.random((2, n_years))
+    results_batch = gwpstar_climate_batch(start, end, **{name: values[None] for name, values in emissions.items()}, total_aircraft_distance=total_aircraft_distance[None],
+                                          operations_contrails_gain=np.zeros((1, n_years)), fuel_effect_correction_contrails=fuel_effect_correction_contrails)
+    deviation = 0.0
+    for i in range(2):
+        results_reference = gwpstar_climate_reference(**emissions, total_aircraft_distance=total_aircraft_distance, fuel_effect_correction_contrails=fuel_effect_correction_contrails[i])
+        results_here = results_batch.loc[i].loc[start:end, list(results_reference)]
+        deviation = max(deviation, max_relative_deviation(results_here, np.column_stack(list(results_reference.values()))))
+    return deviation
+
+#%% perform the checks, for the default and a long time horizon (for which the 'fft' and 'recursive' methods are intended)
+tolerance = 1e-6
+
+for start, end in [(2024, 2070), (2024, 2300)]:
+    deviation = LWE_methods_max_deviation(start, end)
+    if deviation > tolerance:
+        raise ValueError(f"LWE methods deviate by up to {deviation:.2e} (relative) for {start}-{end}")
+    logging.info(f"LWE methods agree for {start}-{end} (largest relative deviation: {deviation:.2e})")
+    deviation = GWPstar_batch_max_deviation(start, end)
+    if deviation > tolerance:
+        raise ValueError(f"GWP* batch calculation deviates by up to {deviation:.2e} (relative) from the reference for {start}-{end}")
+    logging.info(f"GWP* batch calculation agrees with the reference for {start}-{end} (largest relative deviation: {deviation:.2e})")
@@ -1,7 +1,12 @@
 import pandas as pd
 import numpy as np
 import pickle 
+import hashlib
+import functools
 import logging
+import os
+import multiprocessing
+import concurrent.futures
 logging.basicConfig(level=logging.INFO)
 
 from _10_functions import *
@@ -9,7 +14,7 @@ from _11_define_scenarios import *
 from _21_plot_scenarios import *
 
 #%% function in which a variaty of scenario variables (constant across scenarios) are defined and the scenario is run
-def run_scenario(y_start, y_end, y_init, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth_scenario, occuptation_improvements, aaf_advanced, hydrogen_introduced, aircraft_performance, lh2_aircraft_performance, PEM_performance, DAC_performance, FT_performance, LIQ_performance):    
+def run_scenario(y_start, y_end, y_init, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth_scenario, occuptation_improvements, aaf_advanced, hydrogen_introduced, aircraft_performance, lh2_aircraft_performance, PEM_performance, DAC_performance, FT_performance, LIQ_performance, contribution_analysis = False):    
     # starting passenger-kilometer distance for flights [RPK]
     rpk_2019 = [1.71e11, 3.58e11, 1.24e11, 2.34e10,  # intra-EU+ NB flights
                    4.39e9, 3.95e10, 7.47e10, 6.58e10,   # extra-EU+ NB flights
@@ -144,16 +149,79 @@ def run_scenario(y_start, y_end, y_init, hydrogen_method, aircraft_names, aircra
 
     # define performance of fuel infrastructure (low, mid, or high)
     y_plants_start, y_plants_end = plant_years(y_start, y_end)
-    PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped = define_PEM_performance(PEM_performance, y_plants_start, y_plants_end)
-    DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0 = define_DAC_performance(DAC_performance, y_plants_start, y_plants_end)
-    FT_elec, FT_co2, FT_h2, FT_co2_emissions = define_FT_performance(FT_performance, y_plants_start, y_plants_end)
-    LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped  = define_LIQ_performance(LIQ_performance, y_plants_start, y_plants_end)
+    plant_chars, plant_ages = plant_performance_chars(PEM_performance, DAC_performance, FT_performance, LIQ_performance, y_plants_start, y_plants_end, tuple(plants))
        
     #execute functions
-    scenario_results = single_type_scenario(y_start, y_end, aircraft_dataframes_yearly, aircraft_char, rpk_segments, max_age_0, ages_0, aaf_0, aaf_milestones, no_decreases, occupation, cirrus_rf_change_h2, y_plants_start, y_plants_end, plants, PEM_elec_progression, PEM_elec_0, PEM_occupation, PEM_water, PEM_h2_escaped, DAC_elec_progression, DAC_elec_0, DAC_sorbent_progression, DAC_sorbent_0, FT_elec, FT_co2, FT_h2, FT_co2_emissions, LIQ_elec_progression, LTQ_elec_0, LIQ_h2_escaped, hydrogen_method, plant_dataframes_yearly, process_dataframes_yearly)
+    scenario_results = single_type_scenario(y_start, y_end, aircraft_dataframes_yearly, aircraft_char, rpk_segments, max_age_0, ages_0, aaf_0, aaf_milestones, no_decreases, occupation, cirrus_rf_change_h2, plant_chars, plant_ages, hydrogen_method, plant_dataframes_yearly, process_dataframes_yearly, contribution_analysis)
 
     return scenario_results + [y_start]
 
+#%% functions to run a list of scenarios (as enumerated by foreground_scenarios or background_scenarios), using LCIA data that is pre-loaded below
+def run_scenario_from_grid(scenario, contribution_analysis = False):
+    pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen = scenario
+    hydrogen_method = 'fleet'
+    if hydrogen_source == 'market': hydrogen_method = 'process'
+    aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly_wind, plant_dataframes_yearly_grid, process_dataframes_yearly = pathway_data[pathway]
+    plant_dataframes_yearly = plant_dataframes_yearly_grid
+    if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind
+    PEM_performance = DAC_performance = FT_performance = LIQ_performance = fuel_tech
+    return run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance, contribution_analysis)
+
+# hash of the model code: the scripts with the functions used by run_scenario, and the part of this script up to the universal scenario variables (run_scenario, with the constants defined in it)
+# the universal scenario variables and LCIA data are part of pathway_hashes, and the rest of this script only selects which scenarios are run
+def model_code_hash():
+    code_hash = hashlib.sha256()
+    for file_name in ['_10_functions.py', '_11_define_scenarios.py', '_12_LWE_function.py', '_13_GWPstar_functions.py']:
+        code_hash.update(file_hash(file_name).encode())
+    with open('_20_run_scenarios.py') as f:
+        code = f.read()
+    code_hash.update(code[:code.index('\n#%% universal')].encode()) # the cell of the universal scenario variables starts the rest of this script
+    return code_hash.hexdigest()
+
+# hash of everything the results of a scenario depend on besides its scenario variables: the LCIA data and universal scenario variables of its pathway (pathway_hashes), the model code,
+# the values its scenario variables resolve to (e.g., the aircraft performance of 'mid' aircraft development, as defined in _11_define_scenarios.py), and whether contributions are calculated
+def scenario_data_hash(scenario, code_hash, contribution_analysis = False):
+    pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen = scenario
+    y_plants_start, y_plants_end = plant_years(flight_start_year, flight_end_year)
+    scenario_values = (rpk_from_growth_scenario(initiation_year, flight_start_year, flight_end_year, [1], growth), define_AC_performance(aircraft_tech), define_HC_performance(lh2_tech),
+                       [define_performance(fuel_tech, y_plants_start, y_plants_end) for define_performance in [define_PEM_performance, define_DAC_performance, define_FT_performance, define_LIQ_performance]])
+    return hashlib.sha256(pathway_hashes[pathway].encode() + code_hash.encode() + pickle.dumps(scenario_values) + f'contribution analysis: {contribution_analysis}'.encode()).hexdigest()
+
+# scenarios are divided over a number of worker processes; results are returned in the same order as the scenarios
+# workers are forked, so that they share the pre-loaded LCIA data rather than receiving a copy of it. where forking is not possible (e.g., on Windows), scenarios are run in series
+# each scenario is stored in folder as soon as it is calculated; scenarios that are already stored (with the same data and code, see scenario_data_hash) are not calculated again, so that an interrupted run can be resumed
+# with contribution_analysis = True, the LCIA results per aircraft (the first item of the results) are calculated and stored as well
+def run_scenario_grid(scenarios, workers, folder, contribution_analysis = False):
+    scenarios_unique = list(dict.fromkeys(tuple(scenario) for scenario in scenarios)) # scenarios that occur more than once (e.g., in background_scenarios) are calculated once
+    code_hash = model_code_hash()
+    data_hashes = [scenario_data_hash(scenario, code_hash, contribution_analysis) for scenario in scenarios_unique]
+    remove_stale_scenarios(folder, scenarios_unique, data_hashes)
+    scenarios_to_run = [(scenario, data_hash) for scenario, data_hash in zip(scenarios_unique, data_hashes) if not is_stored(folder, scenario, data_hash)]
+    logging.info(f"{len(scenarios_unique) - len(scenarios_to_run)} of {len(scenarios_unique)} scenarios already stored in {folder}")
+    
+    # scenarios that fail are skipped (and reported at the end), so that the results of all other scenarios are stored
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context = multiprocessing.get_context('fork')) as executor:
+            futures = {executor.submit(run_scenario_from_grid, scenario, contribution_analysis): (scenario, data_hash) for scenario, data_hash in scenarios_to_run}
+            failed = store_scenario_results_as_calculated(folder, ((*futures[future], future.result) for future in concurrent.futures.as_completed(futures)))
+    else: failed = store_scenario_results_as_calculated(folder, ((scenario, data_hash, functools.partial(run_scenario_from_grid, scenario, contribution_analysis)) for scenario, data_hash in scenarios_to_run))
+    if failed != []: raise RuntimeError(f"{len(failed)} of {len(scenarios_to_run)} scenario(s) failed (the results of the others are stored in {folder}): {failed}")
+    
+    return load_scenario_grid(folder, scenarios)[1]
+
+# store each scenario as soon as its calculation (a function returning its results) is done; returns the scenarios whose calculation failed
+def store_scenario_results_as_calculated(folder, calculations):
+    failed = []
+    for i, (scenario, data_hash, calculate) in enumerate(calculations):
+        try: scenario_results_here = calculate()
+        except Exception:
+            logging.exception(f"Failed to calculate scenario #{i}: {scenario}")
+            failed.append(scenario)
+            continue
+        store_scenario_results(folder, scenario, scenario_results_here, data_hash)
+        logging.info(f"Calculated scenario #{i}: {scenario}")
+    return failed
+
 #%% universal scenario variables
 # define start and end years
 initiation_year = 2019 # start year of 2019 is virtually hard-coded into the model -- RPK buckets and growth lists depend on it
@@ -182,8 +250,16 @@ aircraft_names_2p5C, aircraft_dataframes_yearly_2p5C, plant_names_2p5C, plant_da
 aircraft_names_1p7C, aircraft_dataframes_yearly_1p7C, plant_names_1p7C, plant_dataframes_yearly_wind_1p7C, plant_dataframes_yearly_grid_1p7C, market_dataframes_yearly_1p7C = use_file_names(flight_start_year, flight_end_year, aircraft_file_1p7C, wind_file_1p7C, grid_file_1p7C, market_file_1p7C)
 aircraft_names_1p4C, aircraft_dataframes_yearly_1p4C, plant_names_1p4C, plant_dataframes_yearly_wind_1p4C, plant_dataframes_yearly_grid_1p4C, market_dataframes_yearly_1p4C = use_file_names(flight_start_year, flight_end_year, aircraft_file_1p4C, wind_file_1p4C, grid_file_1p4C, market_file_1p4C)
 
-hydrogen_method = 'fleet'
-hydrogen_method = 'process'
+# LCIA data per pathway, as used by run_scenario_from_grid
+pathway_data = {'1.4C': (aircraft_names_1p4C, aircraft_dataframes_yearly_1p4C, plant_names_1p4C, plant_dataframes_yearly_wind_1p4C, plant_dataframes_yearly_grid_1p4C, market_dataframes_yearly_1p4C),
+                '1.7C': (aircraft_names_1p7C, aircraft_dataframes_yearly_1p7C, plant_names_1p7C, plant_dataframes_yearly_wind_1p7C, plant_dataframes_yearly_grid_1p7C, market_dataframes_yearly_1p7C),
+                '2.5C': (aircraft_names_2p5C, aircraft_dataframes_yearly_2p5C, plant_names_2p5C, plant_dataframes_yearly_wind_2p5C, plant_dataframes_yearly_grid_2p5C, market_dataframes_yearly_2p5C)}
+
+# hash of the LCIA files and universal scenario variables used by the scenarios of each pathway: stored results of a scenario are only used if this has not changed
+pathway_files = {'1.4C': (aircraft_file_1p4C, wind_file_1p4C, grid_file_1p4C, market_file_1p4C),
+                 '1.7C': (aircraft_file_1p7C, wind_file_1p7C, grid_file_1p7C, market_file_1p7C),
+                 '2.5C': (aircraft_file_2p5C, wind_file_2p5C, grid_file_2p5C, market_file_2p5C)}
+pathway_hashes = {pathway: hashlib.sha256(repr((initiation_year, flight_start_year, flight_end_year) + tuple(file_hash(file_name) for file_name in files)).encode()).hexdigest() for pathway, files in pathway_files.items()}
 
 #%% run selected scenario(s) -- takes 10-30 seconds per scenario, depending on hardware
 
@@ -205,89 +281,21 @@ hydrogen_impl = [True, False]
 foreground_sensitivity = True
 background_sensitivity = True
 
+# number of processes used to run scenarios in parallel (1: run scenarios in series)
+workers = os.cpu_count()
+
+# whether LCIA results per aircraft are calculated and stored, as used for contribution analyses (e.g., calculate_impact_per_mj); this makes scenarios slower to run and their results larger
+contribution_analysis_foreground = True
+contribution_analysis_background = False
+
+# folders in which scenario results are stored (read them with load_scenario_grid)
+results_folder_foreground = 'scenario_results/foreground'
+results_folder_background = 'scenario_results/background'
+
 if foreground_sensitivity == True:
-    i = 0
-    all_scenario_results = []
-    all_scenario_names = []
-    for e_fuel in e_fuel_impl:
-        if e_fuel == 'no ReFuelEU': # only run a few scenarios here
-            pathway                      = scenarios_pathways[0]
-            hydrogen_method              = 'fleet'
-            hydrogen_source              = 'grid'
-            aircraft_names               = aircraft_names_1p7C
-            aircraft_dataframes_yearly   = aircraft_dataframes_yearly_1p7C
-            plants                       = plant_names_1p7C
-            plant_dataframes_yearly      = plant_dataframes_yearly_grid_1p7C
-            process_dataframes_yearly    = market_dataframes_yearly_1p7C
-            fuel_tech                    = 'low'
-            PEM_performance = DAC_performance = FT_performance = LIQ_performance = fuel_tech
-            hydrogen = False
-            lh2_tech = 'low'
-            for aircraft_tech in aircraft_techs:
-                for growth in growth_scenarios:
-                    for capacity in capacity_impl:
-                        scenario_results_here = run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance)
-                        scenario_name_here = scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen)
-                        all_scenario_results.append(scenario_results_here)
-                        all_scenario_names.append(scenario_name_here)
-                        logging.info(f"Calculated scenario #{i}")
-                        i += 1
-        else:
-            for pathway in scenarios_pathways:
-                for hydrogen_source in hydrogen_sources:
-                    hydrogen_method = 'fleet'
-                    if hydrogen_source == 'market': hydrogen_method = 'process'
-                    if pathway == '1.4C':    
-                        aircraft_names               = aircraft_names_1p4C
-                        aircraft_dataframes_yearly   = aircraft_dataframes_yearly_1p4C
-                        plants                       = plant_names_1p4C
-                        plant_dataframes_yearly      = plant_dataframes_yearly_grid_1p4C
-                        if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_1p4C
-                        process_dataframes_yearly    = market_dataframes_yearly_1p4C
-                    if pathway == '1.7C':    
-                        aircraft_names               = aircraft_names_1p7C
-                        aircraft_dataframes_yearly   = aircraft_dataframes_yearly_1p7C
-                        plants                       = plant_names_1p7C
-                        plant_dataframes_yearly      = plant_dataframes_yearly_grid_1p7C
-                        if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_1p7C
-                        process_dataframes_yearly    = market_dataframes_yearly_1p7C    
-                    if pathway == '2.5C':    
-                        aircraft_names               = aircraft_names_2p5C
-                        aircraft_dataframes_yearly   = aircraft_dataframes_yearly_2p5C
-                        plants                       = plant_names_2p5C
-                        plant_dataframes_yearly      = plant_dataframes_yearly_grid_2p5C
-                        if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_2p5C
-                        process_dataframes_yearly    = market_dataframes_yearly_2p5C
-                    for growth in growth_scenarios:
-                        for aircraft_tech in aircraft_techs:
-                            for capacity in capacity_impl:
-                                for fuel_tech in fuel_techs:
-                                    PEM_performance = DAC_performance = FT_performance = LIQ_performance = fuel_tech
-                                    for hydrogen in hydrogen_impl:
-                                        if hydrogen == False: # only one scenario past this point, since difference in LH2_tech has no effect
-                                            lh2_tech = 'low'
-                                            scenario_results_here = run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance)
-                                            scenario_name_here = scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen)
-                                            all_scenario_results.append(scenario_results_here)
-                                            all_scenario_names.append(scenario_name_here)
-                                            logging.info(f"Calculated scenario #{i}")
-                                            i += 1
-                                        else:
-                                            for lh2_tech in lh2_techs:                               
-                                                scenario_results_here = run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance)
-                                                scenario_name_here = scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech, capacity, e_fuel, hydrogen)
-                                                all_scenario_results.append(scenario_results_here)
-                                                all_scenario_names.append(scenario_name_here)
-                                                logging.info(f"Calculated scenario #{i}")
-                                                i += 1
-    
-    with open('pickled_scenario_results/scenario_results.pkl', 'wb') as f:
-        pickle.dump(all_scenario_results, f)
-        f.close()
-        
-    with open('pickled_scenario_results/scenario_names.pkl', 'wb') as f:
-        pickle.dump(all_scenario_names, f)
-        f.close()
+    all_scenarios = foreground_scenarios(scenarios_pathways, hydrogen_sources, growth_scenarios, aircraft_techs, lh2_techs, fuel_techs, capacity_impl, e_fuel_impl, hydrogen_impl)
+    all_scenario_results = run_scenario_grid(all_scenarios, workers, results_folder_foreground, contribution_analysis_foreground)
+    all_scenario_names = [scenario_name_generator(*scenario) for scenario in all_scenarios]
 
 # redefine selected variable values as considered for "background sensitivity"
 capacity_impl = [False]
@@ -296,68 +304,6 @@ scenarios_pathways = ['1.4C', '1.7C', '2.5C']
 hydrogen_sources = ['market', 'grid', 'wind']
 
 if background_sensitivity == True:
-    i = 0
-    all_scenario_results_bck = []
-    all_scenario_names_bck = []
-    for e_fuel in e_fuel_impl:
-        for pathway in scenarios_pathways:
-            for hydrogen_source in hydrogen_sources:
-                hydrogen_method = 'fleet'
-                if hydrogen_source == 'market': hydrogen_method = 'process'
-                if pathway == '1.4C':    
-                    aircraft_names               = aircraft_names_1p4C
-                    aircraft_dataframes_yearly   = aircraft_dataframes_yearly_1p4C
-                    plants                       = plant_names_1p4C
-                    plant_dataframes_yearly      = plant_dataframes_yearly_grid_1p4C
-                    if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_1p4C
-                    process_dataframes_yearly    = market_dataframes_yearly_1p4C
-                if pathway == '1.7C':    
-                    aircraft_names               = aircraft_names_1p7C
-                    aircraft_dataframes_yearly   = aircraft_dataframes_yearly_1p7C
-                    plants                       = plant_names_1p7C
-                    plant_dataframes_yearly      = plant_dataframes_yearly_grid_1p7C
-                    if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_1p7C
-                    process_dataframes_yearly    = market_dataframes_yearly_1p7C    
-                if pathway == '2.5C':    
-                    aircraft_names               = aircraft_names_2p5C
-                    aircraft_dataframes_yearly   = aircraft_dataframes_yearly_2p5C
-                    plants                       = plant_names_2p5C
-                    plant_dataframes_yearly      = plant_dataframes_yearly_grid_2p5C
-                    if hydrogen_source == 'wind': plant_dataframes_yearly = plant_dataframes_yearly_wind_2p5C
-                    process_dataframes_yearly    = market_dataframes_yearly_2p5C
-                for growth in growth_scenarios:
-                    for aircraft_tech in aircraft_techs:
-                        for capacity in capacity_impl:
-                            for fuel_tech in fuel_techs:
-                                for hydrogen in hydrogen_impl:
-                                    fuel_tech_here = fuel_tech
-                                    hydrogen_here = hydrogen
-                                    if e_fuel == 'no ReFuelEU': 
-                                        hydrogen_here = False
-                                        fuel_tech_here = 'low'
-                                    if hydrogen_here == False: # only one scenario past this point, since difference in LH2_tech has no effect
-                                        lh2_tech = 'low'
-                                        PEM_performance = DAC_performance = FT_performance = LIQ_performance = fuel_tech_here
-                                        scenario_results_here = run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen_here, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance)
-                                        scenario_name_here = scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech_here, capacity, e_fuel, hydrogen_here)
-                                        all_scenario_results_bck.append(scenario_results_here)
-                                        all_scenario_names_bck.append(scenario_name_here)
-                                        logging.info(f"Calculated scenario #{i}")
-                                        i += 1
-                                    else:
-                                        for lh2_tech in lh2_techs:
-                                            PEM_performance = DAC_performance = FT_performance = LIQ_performance = fuel_tech_here
-                                            scenario_results_here = run_scenario(flight_start_year, flight_end_year, initiation_year, hydrogen_method, aircraft_names, aircraft_dataframes_yearly, plants, plant_dataframes_yearly, process_dataframes_yearly, growth, capacity, e_fuel, hydrogen_here, aircraft_tech, lh2_tech, PEM_performance, DAC_performance, FT_performance, LIQ_performance)
-                                            scenario_name_here = scenario_name_generator(pathway, hydrogen_source, growth, aircraft_tech, lh2_tech, fuel_tech_here, capacity, e_fuel, hydrogen_here)
-                                            all_scenario_results_bck.append(scenario_results_here)
-                                            all_scenario_names_bck.append(scenario_name_here)
-                                            logging.info(f"Calculated scenario #{i}")
-                                            i += 1
-                                            
-    with open('pickled_scenario_results/scenario_results_bck.pkl', 'wb') as f:
-        pickle.dump(all_scenario_results_bck, f)
-        f.close()
-        
-    with open('pickled_scenario_results/scenario_names_bck.pkl', 'wb') as f:
-        pickle.dump(all_scenario_names_bck, f)
-        f.close()
\ No newline at end of file
+    all_scenarios_bck = background_scenarios(scenarios_pathways, hydrogen_sources, growth_scenarios, aircraft_techs, lh2_techs, fuel_techs, capacity_impl, e_fuel_impl, hydrogen_impl)
+    all_scenario_results_bck = run_scenario_grid(all_scenarios_bck, workers, results_folder_background, contribution_analysis_background)
+    all_scenario_names_bck = [scenario_name_generator(*scenario) for scenario in all_scenarios_bck]
\ No newline at end of file
@@ -84,6 +84,7 @@ def make_legend_timeline_alt(scenarios):
 
 #%% function used to process scenario results by determining LCIA results per MJ fuel
 def calculate_impact_per_mj(total_fuel, list_of_dic, impact_cat):
+    if list_of_dic is None: raise ValueError("LCIA results per aircraft are not available: run the scenario with contribution_analysis = True")
     fuel_impacts = extract_processes(list_of_dic, impact_cat, list(range(2,len(list_of_dic)))) # 0 and 1 are excluded, since that are aircraft impacts
     sum_of_impacts = fuel_impacts.sum(axis = 1)
     sum_of_fuel = total_fuel.sum(axis = 1)